@@ -1 +1,9 @@
-from pyclicommander.commander import Commander  # noqa
+__all__ = ["Commander"]
+
+
+def __getattr__(name):
+    # Imported on first use so that pyclicommander.client and pyclicommander.completion start fast.
+    if name == 'Commander':
+        from pyclicommander.commander import Commander
+        return Commander
+    raise AttributeError(f"module 'pyclicommander' has no attribute {name!r}")
@@ -0,0 +1,35 @@
+import shlex
+from collections import namedtuple
+
+# Outcome of one command line in a batch, error is None when the command succeeded.
+BatchResult = namedtuple('BatchResult', ['line', 'args', 'result', 'error'])
+
+
+def iter_argvs(lines):
+    """ (line number, argv) for each command line, strings are shlex split and blank/comment lines skipped.
+
+    >>> list(iter_argvs(["speak 'hello world'", "", "# comment", ["speak", "apa"]]))
+    [(1, ['speak', 'hello world']), (4, ['speak', 'apa'])]
+    """
+    for line_no, line in enumerate(lines, 1):
+        if isinstance(line, str):
+            if not (line := shlex.split(line, comments=True)):
+                continue
+        yield line_no, list(line)
+
+
+def split_pipeline(line):
+    """ argv of each stage of a pipeline command line, stages separated by |.
+
+    >>> split_pipeline("list users | enrich --field='full name'")
+    [['list', 'users'], ['enrich', '--field=full name']]
+    """
+    lexer = shlex.shlex(line, posix=True, punctuation_chars='|')
+    lexer.whitespace_split = True
+    stages = [[]]
+    for token in lexer:
+        if token == '|':
+            stages.append([])
+        else:
+            stages[-1].append(token)
+    return stages
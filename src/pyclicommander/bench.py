@@ -0,0 +1,149 @@
+""" Benchmarks for registration, dispatch, parsing and help rendering on synthetic command trees.
+
+    $ python -m pyclicommander.bench --sizes=10,1000,100000 --json-file=results.json
+"""
+import io
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+from pyclicommander.commander import Commander
+
+commander = Commander("python -m pyclicommander.bench")
+
+# Max number of argvs timed for the per call benchmarks.
+SAMPLES = 10000
+
+
+def _handler(*args, **kwargs):
+    """ Benchmark command. """
+    return args
+
+
+def _base(i, base, depth):
+    digits = []
+    for _ in range(depth):
+        i, digit = divmod(i, base)
+        digits.append(digit)
+    return digits
+
+
+def wide_tree(size):
+    """ All commands directly below the root. """
+    return [(f"cmd{i}", [f"cmd{i}"]) for i in range(size)]
+
+
+def deep_tree(size):
+    """ Commands four levels deep with a fan-out of 8 on each level. """
+    depth = 4
+    definitions = []
+    for i in range(size):
+        words = [f"l{level}x{d}" for level, d in enumerate(_base(i, 8, depth))] + [f"cmd{i}"]
+        definitions.append((" ".join(words), words))
+    return definitions
+
+
+def wildcard_tree(size):
+    """ Resource commands with a wildcard in the middle of the path. """
+    return [(f"res{i % 100} ID action{i // 100}", [f"res{i % 100}", "some-id", f"action{i // 100}"])
+            for i in range(size)]
+
+
+def flag_tree(size):
+    """ Commands with aliased flags, value flags and variadic parameters. """
+    return [(f"cmd{i} [-q/--quiet] [--user=NAME] [--log-level=LEVEL] [-v/--verbose] [ARG...]",
+             [f"cmd{i}", "a", "b", "-q", "--user=apa", "--log-level=debug", "c"])
+            for i in range(size)]
+
+
+SHAPES = {
+    'wide': wide_tree,
+    'deep': deep_tree,
+    'wildcard': wildcard_tree,
+    'flags': flag_tree,
+}
+
+
+def _timed(func, items):
+    """ Total seconds for calling func on each item. """
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def _per_op(seconds, count):
+    return {'total_s': seconds, 'per_op_us': seconds / max(count, 1) * 1e6, 'ops': count}
+
+
+def bench_memory(definitions):
+    """ Peak memory for building and compiling the tree, measured separately since tracemalloc skews timings. """
+    tracemalloc.start()
+    try:
+        memory_commander = Commander("bench")
+        for definition, _argv in definitions:
+            memory_commander.add_cli(definition, _handler)
+        memory_commander.compile()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_bytes': peak, 'retained_bytes': current, 'bytes_per_command': current / max(len(definitions), 1)}
+
+
+def bench_tree(definitions):
+    samples = [argv for _definition, argv in definitions[:SAMPLES]]
+    result = {'commands': len(definitions)}
+
+    bench_commander = Commander("bench")
+    result['register'] = _per_op(_timed(lambda d: bench_commander.add_cli(d[0], _handler), definitions),
+                                 len(definitions))
+    start = time.perf_counter()
+    bench_commander.compile()
+    result['compile'] = _per_op(time.perf_counter() - start, 1)
+    result['memory'] = bench_memory(definitions)
+
+    resolve = bench_commander._Commander__get_cmd
+    result['resolve'] = _per_op(_timed(resolve, samples), len(samples))
+    result['call'] = _per_op(_timed(bench_commander.call, samples), len(samples))
+
+    with redirect_stdout(io.StringIO()):
+        help_samples = samples[:1000]
+        result['help'] = _per_op(_timed(bench_commander.help, help_samples), len(help_samples))
+        result['help_all_commands'] = _per_op(_timed(lambda _: bench_commander.help_all_commands(), [None]), 1)
+    return result
+
+
+def run_benchmarks(sizes=(10, 1000, 10000), shapes=tuple(SHAPES)):
+    """ Benchmark results per shape and size, as a json serializable dict. """
+    results = {
+        'python': sys.version.split()[0],
+        'results': [],
+    }
+    for shape in shapes:
+        for size in sizes:
+            tree_result = bench_tree(SHAPES[shape](size))
+            tree_result['shape'] = shape
+            tree_result['size'] = size
+            results['results'].append(tree_result)
+    return results
+
+
+@commander.cli("[--sizes=SIZES] [--shapes=SHAPES] [--json-file=FILE]")
+def main(sizes="10,1000,10000", shapes=",".join(SHAPES), json_file=None):
+    """ Run the benchmarks and print the results as json.
+
+    --sizes and --shapes are comma separated, shapes are wide, deep, wildcard and flags.
+    With --json-file=FILE the results are written to FILE instead.
+    """
+    results = run_benchmarks([int(size) for size in sizes.split(",")], shapes.split(","))
+    if json_file:
+        with open(json_file, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    commander.call_with_help(sys.argv[1:])
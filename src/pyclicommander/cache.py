@@ -0,0 +1,74 @@
+import marshal
+import os
+
+from pyclicommander.exceptions import CommanderError
+from pyclicommander.memoize import ResultCache
+from pyclicommander.parser import CommandParser
+
+CACHE_VERSION = 4
+
+# Info keys that are rebuilt when loading rather than stored, help is rendered with the name of the Commander.
+_SKIP_INFO = ('func', 'parser', 'converter', 'help')
+
+
+def source_stamps(sources):
+    """ (path, mtime_ns, size) for each source file, used to validate a cache file. """
+    stamps = []
+    for source in sources:
+        st = os.stat(source)
+        stamps.append((os.fspath(source), st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+def dump_cmd(cmd):
+    """ Nested tuples of a Cmd tree, only containing types that marshal can handle. """
+    info = {k: dict(v) if isinstance(v, dict) else v for k, v in cmd.info.items() if k not in _SKIP_INFO}
+    if cmd.active and not info.get('import_path'):
+        func = cmd['func']
+        if '<locals>' in func.__qualname__:
+            raise CommanderError(f"{func.__qualname__} can not be imported, command '{cmd['usage']}' can't be cached")
+        info['import_path'] = f"{func.__module__}:{func.__qualname__}"
+    if result_cache := info.get('cache'):
+        info['cache'] = result_cache.config()
+    return (cmd._name, cmd.wildcard, cmd.active, info, tuple(dump_cmd(s) for s in cmd.subcommands.values()))
+
+
+def load_cmd(dumped, cmd_cls, parsers=None):
+    """ Cmd tree from dump_cmd, commands with the same parameters and flags share their parser. """
+    parsers = {} if parsers is None else parsers
+    name, wildcard, active, info, subcommands = dumped
+    cmd = cmd_cls(name, wildcard, active)
+    for key, value in info.items():
+        cmd[key] = value
+    if active:
+        cmd['func'] = None
+        if result_cache := info.get('cache'):
+            cmd['cache'] = ResultCache(*result_cache)
+        parser_key = (len(info['params']), info['optional_params'], info['flag_names'])
+        if (parser := parsers.get(parser_key)) is None:
+            parser = parsers[parser_key] = CommandParser(info['params'], info['optional_params'], info['flags'],
+                                                         info['flag_mapping'], info['flag_names'])
+        cmd['parser'] = parser
+    for sub in subcommands:
+        cmd.add_subcommand(load_cmd(sub, cmd_cls, parsers))
+    return cmd
+
+
+def save_tree(cmd, path, sources=()):
+    data = marshal.dumps((CACHE_VERSION, source_stamps(sources), dump_cmd(cmd)))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_tree(path, cmd_cls, sources=()):
+    """ Cmd tree from cache file, None if missing, corrupt or any of the sources changed. """
+    try:
+        with open(path, 'rb') as f:
+            version, stamps, dumped = marshal.loads(f.read())
+        if version != CACHE_VERSION or stamps != source_stamps(sources):
+            return None
+        return load_cmd(dumped, cmd_cls)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
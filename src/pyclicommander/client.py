@@ -0,0 +1,69 @@
+""" Thin client for a Commander served with Commander.serve, only depends on the standard library. """
+import json
+import os
+import socket
+import struct
+import sys
+
+_HEADER = struct.Struct('!I')
+
+
+def send_frame(sock, obj):
+    data = json.dumps(obj).encode()
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_frame(sock):
+    """ Next frame from sock, None when the connection was closed. """
+    if (header := _recv_exactly(sock, _HEADER.size)) is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if (data := _recv_exactly(sock, size)) is None:
+        return None
+    return json.loads(data)
+
+
+def _recv_exactly(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        if not (chunk := sock.recv(size - len(buf))):
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def run(socket_path, argv, stdin=None, stdout=None, stderr=None):
+    """ Run argv on the server and stream its output, returns the exit code.
+
+    stdin defaults to whatever is piped to this process. Raises OSError when no server is listening.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(os.fspath(socket_path))
+        if stdin is None:
+            stdin = '' if sys.stdin is None or sys.stdin.isatty() else sys.stdin.read()
+        send_frame(sock, {'argv': list(argv), 'cwd': os.getcwd(), 'env': dict(os.environ), 'stdin': stdin})
+        while (frame := recv_frame(sock)) is not None:
+            if 'exit' in frame:
+                return frame['exit']
+            stream = stdout if frame['stream'] == 'stdout' else stderr
+            stream.write(frame['data'])
+            stream.flush()
+    # Server went away in the middle of the command.
+    return 1
+
+
+def main(socket_path, fallback=None, argv=None):
+    """ Client entry point, calls fallback(argv) in-process when the server isn't running.
+
+    >>> sys.exit(main("/tmp/app.sock", fallback=lambda argv: import_module("app.cli").main(argv)))
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        return run(socket_path, argv)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if fallback is None:
+            raise
+        return fallback(argv)
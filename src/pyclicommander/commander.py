@@ -1,16 +1,131 @@
+import asyncio
+import difflib
+import heapq
+import inspect
+import io
+import json
+import os
+import shlex
 import sys
-from functools import wraps
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from functools import partial, wraps
 
-from pyclicommander.utils import get_idx
-from pyclicommander.exceptions import MissingMandatoryArgument, UnknownFlag, UnknownArgument, UnknownCommand
+from pyclicommander.batch import BatchResult, iter_argvs, split_pipeline
+from pyclicommander.cache import load_tree, save_tree
+from pyclicommander.compiled import CompiledTree
+from pyclicommander.convert import build_converter
+from pyclicommander.defaults import Defaults
+from pyclicommander.memoize import make_key, make_result_cache
+from pyclicommander.output import check_format, write_records
+from pyclicommander.parser import CommandParser, StreamedArgs
+from pyclicommander.profiling import PROFILE_ENV, start as start_profiler
+from pyclicommander.suggest import NGramIndex, suggest
+from pyclicommander.utils import FrozenDict, format_error, import_path_of, import_string
+from pyclicommander.exceptions import (
+    ArgumentFileError, CommandConflict, CommanderError, InvalidArgumentValue, MissingMandatoryArgument, UnknownFlag,
+    UnknownArgument, UnknownCommand
+)
+
+
+# Leaf commands share one empty dict for subcommands (and flags) instead of having their own.
+_EMPTY_DICT = FrozenDict()
+
+
+class CmdInfo:
+    """ Typed fields of an active command, keys that are not fields are kept in extra. """
+    __slots__ = ('name', 'func', 'import_path', 'usage', 'path', 'short_description', 'long_description',
+                 'params', 'optional_params', 'flags', 'flag_mapping', 'flag_names', 'parser', 'cache', 'converter',
+                 'stream', 'mount', 'help', 'extra')
+
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            setattr(self, field, None)
+        for key, value in fields.items():
+            self[key] = value
+
+    def get(self, key, default=None):
+        if key in _INFO_FIELDS:
+            value = getattr(self, key)
+            # Parsed once, the short description is set by then.
+            if (value is None and key in _DOC_FIELDS and self.short_description is None and self.func is not None
+                    and self.func.__doc__):
+                value = self.__parse_doc()[key == 'long_description']
+        else:
+            value = self.extra.get(key) if self.extra else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        if key in _INFO_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __parse_doc(self):
+        """ Short and long description from the handler's __doc__, no long description when there is none. """
+        short_description, *long_description = self.func.__doc__.strip().split('\n', 1)
+        self.short_description = short_description
+        self.long_description = "".join(long_description) or None
+        return self.short_description, self.long_description
+
+    def __getstate__(self):
+        """ Handlers are pickled by import path when they can be imported, @cli leaves a wrapper in their place.
+        The converter is rebuilt on first call. """
+        state = {field: getattr(self, field) for field in self.__slots__}
+        if self.func is not None and (import_path := import_path_of(self.func)) is not None:
+            state['func'] = None
+            state['import_path'] = import_path
+        state['converter'] = None
+        return state
+
+    def __setstate__(self, state):
+        for field, value in state.items():
+            setattr(self, field, value)
+
+    def items(self):
+        for field in _INFO_FIELDS_ORDER:
+            if (value := self.get(field)) is not None:
+                yield field, value
+        if self.extra:
+            yield from self.extra.items()
+
+    def copy(self):
+        """ Copy without the rendered help, which depends on the subcommands. """
+        return CmdInfo(**{key: value for key, value in self.items() if key != 'help'})
+
+    def prefixed(self, prefix):
+        """ Copy with path and usage prefixed by the words of the path the command is mounted at. """
+        info = self.copy()
+        if info.path is not None:
+            info.path = prefix + info.path
+        if info.usage is not None:
+            info.usage = f"{' '.join(prefix)} {info.usage}"
+        return info
+
+
+_INFO_FIELDS_ORDER = CmdInfo.__slots__[:-1]
+_INFO_FIELDS = frozenset(_INFO_FIELDS_ORDER)
+_DOC_FIELDS = frozenset(('short_description', 'long_description'))
+
+# Inactive commands share one empty info.
+_NO_INFO = CmdInfo()
 
 
 class Cmd:
+    __slots__ = ('_name', 'active', 'info', 'subcommands', 'wildcard')
+
     def __init__(self, name, wildcard=False, active=False):
-        self._name = name
+        self._name = sys.intern(name) if name else name
         self.active = active
-        self.info = {}
-        self.subcommands = {}
+        self.info = _NO_INFO
+        self.subcommands = _EMPTY_DICT
         self.wildcard = wildcard
 
     def __eq__(self, other):
@@ -24,6 +139,8 @@ class Cmd:
         return self.info.get(key)
 
     def __setitem__(self, key, val):
+        if self.info is _NO_INFO:
+            self.info = CmdInfo()
         self.info[key] = val
 
     def name(self):
@@ -42,6 +159,8 @@ class Cmd:
         return new_cmd
 
     def add_subcommand(self, sub_cmd):
+        if self.subcommands is _EMPTY_DICT:
+            self.subcommands = {}
         self.subcommands[sub_cmd._name] = sub_cmd
 
     def get_subcommand(self, sub_cmd):
@@ -53,6 +172,32 @@ class Cmd:
                 return cmd
         return wildcard_cmd
 
+    def get_path(self, path):
+        """ Command at the end of path, the exact words of a definition, or None. """
+        cmd = self
+        for word in path:
+            if (cmd := cmd.subcommands.get(word)) is None:
+                return None
+        return cmd
+
+    def handler(self):
+        """ Function to call for this command, imported on first use when registered by import path. """
+        if (func := self.info.func) is None and (import_path := self.info.import_path):
+            func = import_string(import_path)
+            if self.info.cache is not None and inspect.iscoroutinefunction(func):
+                raise CommanderError(f"'{self.info.usage}': cache is not supported for async functions")
+            self.info.func = func
+        return func
+
+    def copy(self):
+        """ Copy of this node with its own info and subcommands dict, sharing the subcommand nodes. """
+        cmd = Cmd(self._name, self.wildcard, self.active)
+        if self.info is not _NO_INFO:
+            cmd.info = self.info.copy()
+        if self.subcommands:
+            cmd.subcommands = dict(self.subcommands)
+        return cmd
+
     def activate(self):
         self.active = True
 
@@ -73,53 +218,356 @@ class Cmd:
                 self.add_subcommand(subcmd)
 
 
+def _load_table(path):
+    """ Dict from a json or toml file. """
+    if str(path).endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise CommanderError("toml files require python 3.11 or later")
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+class _TreeWriter:
+    """ Copy-on-write changes to a tree: a node that may have been seen by a reader is copied on its first change,
+    together with its parents, so readers of a published tree never see a half-made change.
+    """
+
+    def __init__(self, root):
+        self.owned = set()
+        self.root = self.own(root)
+
+    def own(self, cmd):
+        if id(cmd) not in self.owned:
+            cmd = cmd.copy()
+            self.owned.add(id(cmd))
+        return cmd
+
+    def child(self, parent, name):
+        """ Changeable subcommand name of parent (an owned node), None if there is none. """
+        if (sub_cmd := parent.subcommands.get(name)) is not None and id(sub_cmd) not in self.owned:
+            sub_cmd = self.own(sub_cmd)
+            parent.add_subcommand(sub_cmd)
+        return sub_cmd
+
+    def new_child(self, parent, name, wildcard=False):
+        sub_cmd = parent.new_subcommand(name, wildcard)
+        self.owned.add(id(sub_cmd))
+        return sub_cmd
+
+    def merge(self, cmd, other_cmd):
+        """ Same as Cmd.merge into the owned node cmd, other_cmd must not have been published. """
+        if other_cmd.active and not cmd.active:
+            cmd.info = other_cmd.info
+            cmd._name = other_cmd._name
+            cmd.wildcard = other_cmd.wildcard
+            cmd.activate()
+
+        for subname, subcmd in other_cmd.subcommands.items():
+            if subname in cmd.subcommands:
+                self.merge(self.child(cmd, subname), subcmd)
+            else:
+                cmd.add_subcommand(subcmd)
+
+
+def _mounted_tree(cmd, name, prefix):
+    """ Copy of the tree of a mounted Commander, with name as root and prefix added to all paths. """
+    mounted = Cmd(name, cmd.wildcard, cmd.active)
+    if cmd.info is not _NO_INFO:
+        mounted.info = cmd.info.prefixed(prefix)
+    for sub_cmd in cmd.subcommands.values():
+        mounted.add_subcommand(_mounted_tree(sub_cmd, sub_cmd._name, prefix))
+    return mounted
+
+
+def _check_every(every):
+    if every is None or every <= 0:
+        raise InvalidArgumentValue(f"every: invalid value {every!r}, expected seconds > 0", param='every')
+
+
 class Commander():
 
     def __init__(self, cmd_name=None):
         self.cmd_name = cmd_name
         self.cmd = Cmd(cmd_name)
+        self.hooks = []
+        self.defaults = None
+        # Changes are made by one writer at a time on copies of the published nodes, see __snapshot.
+        self._write_lock = threading.RLock()
+        self._writer = None
+        self._compiled = None
+        # Rendered help_all_commands text per path, together with the tree it was rendered from.
+        self._listings = {}
+        # id(node) => (node, NGramIndex of its subcommand names), for suggestions.
+        self._suggest_indexes = {}
+        # (param count, optional params, flag names) => (flags, flag_mapping, parser), shared between commands.
+        self._parsers = {}
+        self._profiler = start_profiler(profile) if (profile := os.environ.get(PROFILE_ENV)) else None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_write_lock']
+        state['_writer'] = None
+        state['_profiler'] = None
+        state['_suggest_indexes'] = {}
+        # Hooks collect in this process, process workers run without them.
+        state['hooks'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._write_lock = threading.RLock()
+
+    @contextmanager
+    def __changing(self):
+        """ Writer for changing the tree, the changed tree is published in one go when done (or failed). """
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = _TreeWriter(self.cmd)
+            try:
+                yield self._writer
+            finally:
+                self.cmd = self._writer.root
+                self.__tree_changed()
+
+    def __snapshot(self):
+        """ Published tree to read from, none of its nodes will be changed anymore.
 
-    def cli(self, definition):
+        Nodes a writer created stay changeable by following writes until a reader takes a snapshot, that way
+        registering many commands before the first call doesn't copy anything.
+        """
+        root = self.cmd
+        if self._writer is not None:
+            with self._write_lock:
+                self._writer = None
+                root = self.cmd
+        return root
+
+    def cli(self, definition, cache=None, stream=False):
         def decorator_wrapper_register_cmd(func):
-            self.add_cli(definition, func)
+            self.add_cli(definition, func, cache=cache, stream=stream)
 
             # needed otherwise __doc__ doesn't work.
-            @wraps(func)
-            def _inner_wrapper(*args, **kwargs):
-                return func(*args, **kwargs)
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def _inner_wrapper(*args, **kwargs):
+                    return await func(*args, **kwargs)
+            else:
+                @wraps(func)
+                def _inner_wrapper(*args, **kwargs):
+                    return func(*args, **kwargs)
 
             return _inner_wrapper
 
         return decorator_wrapper_register_cmd
 
-    def add_cli(self, definition, func, short_description=None, long_description=None):
-        new_cmd = self.__create_cmd(definition, func, short_description, long_description)
-        self.cmd.merge(new_cmd)
+    def add_cli(self, definition, func, short_description=None, long_description=None, cache=None, stream=False):
+        """ Add the command defined by definition, see add_clis for cache and stream. """
+        if (profiler := self._profiler) is not None:
+            start = profiler.clock()
+        new_cmd = self.__create_cmd(definition, func, short_description, long_description, cache, stream)
+        if profiler is not None:
+            created = profiler.clock()
+        with self.__changing() as writer:
+            writer.merge(writer.root, new_cmd)
+        if profiler is not None:
+            profiler.command(definition, func, created - start, profiler.clock() - created)
 
-    def __get_cmd(self, args):
-        d = self.cmd
-        cmd_args = []
-        for i, cmd in enumerate(args):
-            if not cmd.startswith('-') and (subcommand := d.get_subcommand(cmd)):
-                d = subcommand
-                if subcommand.wildcard:
-                    cmd_args += [cmd]
-            else:
-                # matched as far as possible, what is left are arguments to the cmd.
-                cmd_args += args[i:]
+    def add_clis(self, specs):
+        """ Add many clis in one pass, inserting each command straight into the tree.
+
+        specs is either a command table, a dict of definition => function/import path or a dict with keys func,
+        short_description, long_description, cache and stream, or an iterable of (definition, func,
+        short_description, long_description, cache, stream) tuples where all but definition and func are optional.
+
+        cache is True, a maxsize or a ResultCache to cache results. With stream the records returned or yielded by
+        the function are written to stdout, in the format of the reserved --output=text|jsonl|csv flag.
+
+        Raises CommandConflict when a path already has a command or would get two different wildcards on the same
+        level, the commands before the conflicting one stay added.
+        """
+        if isinstance(specs, dict):
+            specs = ((d, s['func'], s.get('short_description'), s.get('long_description'), s.get('cache'),
+                      s.get('stream', False))
+                     if isinstance(s, dict)
+                     else (d, s)
+                     for d, s in specs.items())
+
+        profiler = self._profiler
+        with self.__changing() as writer:
+            for definition, func, *descriptions in specs:
+                if profiler is not None:
+                    start = profiler.clock()
+                path, info = self.__parse_definition(definition, func, *descriptions)
+                if profiler is not None:
+                    created = profiler.clock()
+                cmd = writer.root
+                for w in path:
+                    if (sub_cmd := writer.child(cmd, w)) is None:
+                        wildcard = w[0].isupper()
+                        if wildcard and (other := next((c for c in cmd.subcommands.values() if c.wildcard), None)):
+                            raise CommandConflict(f"'{definition}': wildcard {w} next to wildcard {other.name()}")
+                        sub_cmd = writer.new_child(cmd, w, wildcard)
+                    cmd = sub_cmd
+
+                if cmd.active:
+                    raise CommandConflict(f"'{definition}': already defined by '{cmd['usage']}'")
+                cmd.info = info
+                cmd.activate()
+                if profiler is not None:
+                    profiler.command(definition, func, created - start, profiler.clock() - created)
+
+    def add_clis_from_file(self, path):
+        """ Add clis from a command table (see add_clis) in a json or toml file, functions given as import paths. """
+        self.add_clis(_load_table(path))
+
+    def mount(self, path, commander, short_description=None):
+        """ Add the commands of another Commander under the command words in path.
+
+        commander given as a "pkg.module:attr" import path is only imported when a command line, help or listing
+        of all commands walks into path, so a mount costs the same as a single command until it is used.
+        """
+        words = tuple(sys.intern(w) for w in path.split())
+        with self.__changing() as writer:
+            cmd = writer.root
+            for w in words:
+                cmd = writer.child(cmd, w) or writer.new_child(cmd, w)
+            cmd['mount'] = commander
+            cmd['path'] = words
+            if short_description:
+                cmd['short_description'] = short_description
+            if not isinstance(commander, str):
+                self.__load_mount(writer, cmd)
+
+    def __load_mount(self, writer, cmd):
+        mounted = cmd.info.mount
+        if isinstance(mounted, str):
+            mounted = import_string(mounted)
+        if not isinstance(mounted, Commander):
+            raise CommanderError(f"{cmd.info.mount!r} mounted at '{' '.join(cmd.info.path)}' is not a Commander")
+        short_description = cmd.info.short_description
+        cmd.info.mount = None
+        writer.merge(cmd, _mounted_tree(mounted.__snapshot(), cmd._name, cmd.info.path))
+        if cmd.info.short_description is None:
+            cmd.info.short_description = short_description
+
+    def __load_mounts(self, args):
+        """ Load the mounts args walk into, returns True if any were loaded. """
+        cmd = self.__snapshot()
+        for word in args:
+            if (cmd := cmd.subcommands.get(word)) is None:
+                return False
+            if cmd.info.mount is not None:
                 break
+        else:
+            return False
 
-        if d.active:
-            return d, cmd_args
+        with self.__changing() as writer:
+            cmd = writer.root
+            for word in args:
+                if (cmd := writer.child(cmd, word)) is None:
+                    break
+                if cmd.info.mount is not None:
+                    self.__load_mount(writer, cmd)
+        return True
 
-    def __create_cmd(self, definition, func, short_description=None, long_description=None):
-        """ From the CLI definition parse what are the actual commands and what are flags and/or parameters. """
+    def load_mounts(self):
+        """ Load all mounted Commanders, including the ones mounted by them. """
+        self.__load_subtree_mounts(())
+
+    def __load_subtree_mounts(self, path):
+        while paths := list(self.__mount_paths(path)):
+            for mount_path in paths:
+                self.__load_mounts(mount_path)
+
+    def __mount_paths(self, path=()):
+        """ Paths of the mounts that haven't been loaded yet below path. """
+        pending = [cmd] if (cmd := self.__snapshot().get_path(path)) is not None else []
+        while pending:
+            cmd = pending.pop()
+            if cmd.info.mount is not None:
+                yield cmd.info.path
+            pending.extend(cmd.subcommands.values())
+
+    def set_defaults(self, config=None, env_prefix=None):
+        """ Take flag values not given on the command line from config, a dict or json/toml file, and environment.
+
+        See pyclicommander.defaults.Defaults, flags given on the command line always win.
+        """
+        if isinstance(config, (str, os.PathLike)):
+            config = _load_table(config)
+        self.defaults = Defaults(config, env_prefix)
+        return self.defaults
+
+    def __tree_changed(self):
+        self._compiled = None
+        self._listings = {}
+        self._suggest_indexes = {}
+        if self.defaults is not None:
+            self.defaults.reset()
+
+    def compile(self):
+        """ Freeze the command tree into a lookup structure, done automatically when the tree has changed. """
+        if (profiler := self._profiler) is not None:
+            start = profiler.clock()
+        self._compiled = compiled = CompiledTree(self.__snapshot())
+        if profiler is not None:
+            profiler.compiled(profiler.clock() - start)
+        return compiled
+
+    def save_cache(self, path, sources=()):
+        """ Store the command tree in a cache file, valid for as long as none of the sources are modified. """
+        save_tree(self.__snapshot(), path, sources)
+
+    def load_cache(self, path, sources=()):
+        """ Replace the command tree with the one in a cache file, returns False if the cache is not valid. """
+        if (cmd := load_tree(path, Cmd, sources)) is None:
+            return False
+        with self._write_lock:
+            self._writer = None
+            self.cmd = cmd
+            self.__tree_changed()
+        return True
+
+    def save_completion_index(self, path):
+        """ Store the index used by pyclicommander.completion to complete command lines without this Commander. """
+        from pyclicommander.completion import save_index
+
+        self.load_mounts()
+        save_index(self.__snapshot(), path)
+
+    def __get_cmd(self, args):
+        if (compiled := self._compiled) is None or compiled.root is not self.cmd:
+            compiled = self.compile()
+        if (cmd_info := compiled.get_cmd(args)) is None and self.__load_mounts(args):
+            return self.__get_cmd(args)
+        return cmd_info
+
+    def __create_cmd(self, definition, func, short_description=None, long_description=None, cache=None,
+                     stream=False):
+        """ Single path tree, from the root down to the command defined by definition. """
+        path, info = self.__parse_definition(definition, func, short_description, long_description, cache, stream)
         cmd_root = Cmd(self.cmd_name)
         cmd_current = cmd_root
+        for w in path:
+            cmd_current = cmd_current.new_subcommand(w, wildcard=w[0].isupper())
+        cmd_current.activate()
+        cmd_current.info = info
+        return cmd_root
+
+    def __parse_definition(self, definition, func, short_description=None, long_description=None, cache=None,
+                           stream=False):
+        """ From the CLI definition parse what are the actual commands and what are flags and/or parameters. """
+        info = CmdInfo()
         mandatory_parameters = []
         optional_parameters = []
         flags = {}
         flag_mapping = {}
+        flag_names = []
+        path = []
 
         # parse definition
         for w in filter(None, definition.split(" ")):
@@ -131,7 +579,8 @@ class Commander():
                     keys, *value = opt_w.split("=", 1)
                     main_key = None
                     for key in keys.split("/"):
-                        key = key.lstrip('-').replace("-", "_")
+                        flag_names.append(f"{key}=" if value else key)
+                        key = sys.intern(key.lstrip('-').replace("-", "_"))
                         if main_key is None:
                             main_key = key
                         flag_mapping[key] = main_key
@@ -143,32 +592,55 @@ class Commander():
                     else:
                         optional_parameters.append((opt_w, 1))
             else:
-                cmd_current = cmd_current.new_subcommand(w, wildcard=w[0].isupper())
-                if cmd_current.wildcard:
+                w = sys.intern(w)
+                path.append(w)
+                if w[0].isupper():
                     mandatory_parameters.append(w)
 
-        cmd_current.activate()
+        if stream and 'output' not in flags:
+            flag_names.append('--output=')
+            flags['output'] = True
+            flag_mapping['output'] = 'output'
 
-        # Description texts from __doc__.
-        if func.__doc__:
-            short_description, *long_description = func.__doc__.strip().split('\n', 1)
-            long_description = "".join(long_description) or None
-            cmd_current['short_description'] = short_description
-            cmd_current['long_description'] = long_description
+        # Handler given as "pkg.module:func" is not imported until the command is called.
+        if isinstance(func, str):
+            info['import_path'] = func
+            func_name = func.rpartition(':')[2].rpartition('.')[2]
+            func = None
         else:
+            func_name = func.__name__
+
+        # Description texts from __doc__ are parsed when first asked for, see CmdInfo.get.
+        if func is None or not func.__doc__:
             if short_description:
-                cmd_current['short_description'] = short_description
+                info['short_description'] = short_description
             if long_description:
-                cmd_current['long_description'] = long_description
-
-        cmd_current['name'] = func.__name__
-        cmd_current['func'] = func
-        cmd_current['usage'] = definition
-        cmd_current['params'] = mandatory_parameters
-        cmd_current['optional_params'] = optional_parameters
-        cmd_current['flags'] = flags
-        cmd_current['flag_mapping'] = flag_mapping
-        return cmd_root
+                info['long_description'] = long_description
+
+        info['name'] = func_name
+        info['func'] = func
+        info['usage'] = definition
+        info['path'] = tuple(path)
+        info['params'] = tuple(mandatory_parameters)
+        info['optional_params'] = tuple(optional_parameters)
+        info['flag_names'] = tuple(flag_names)
+        info['cache'] = make_result_cache(cache)
+        if info['cache'] is not None and inspect.iscoroutinefunction(func):
+            raise CommanderError(f"'{definition}': cache is not supported for async functions")
+        if stream:
+            if info['cache'] is not None:
+                raise CommanderError(f"'{definition}': cache is not supported for streamed output")
+            info['stream'] = True
+
+        # Commands with the same parameters and flags share the flag tables and parser.
+        parser_key = (len(info['params']), info['optional_params'], info['flag_names'])
+        if (shared := self._parsers.get(parser_key)) is None:
+            flags = flags or _EMPTY_DICT
+            flag_mapping = flag_mapping or _EMPTY_DICT
+            parser = CommandParser(info['params'], info['optional_params'], flags, flag_mapping, info['flag_names'])
+            shared = self._parsers[parser_key] = (flags, flag_mapping, parser)
+        info['flags'], info['flag_mapping'], info['parser'] = shared
+        return path, info
 
     def call(self, args=sys.argv[1:]):
         if '--help' in args:
@@ -178,90 +650,493 @@ class Commander():
         # Remove empty words.
         args = list(filter(None, args))
 
+        if args and args[0].partition('=')[0] == '--batch' and self.__reserved('batch', args):
+            return self.__call_batch(args)
+
+        if args and args[0].partition('=')[0] == '--every' and self.__reserved('every', args):
+            return self.__call_repeat(args)
+
+        if self.hooks:
+            return self.__call_instrumented(args)
+
+        cmd, cli_args, cli_kwargs = self.__resolve(args)
+        return self.__invoke(cmd, cli_args, cli_kwargs)
+
+    def __reserved(self, flag, args):
+        """ Whether --flag leading args is handled by the Commander, unless the command args resolve to has it. """
+        found = self.__get_cmd(args)
+        return not found or found[0].info.parser.lookup_flag(flag) is None
+
+    def add_hook(self, hook):
+        """ Install an instrumentation hook, see pyclicommander.instrumentation. """
+        self.hooks.append(hook)
+        return hook
+
+    def __run_phase(self, phase, path, func, *args):
+        for hook in self.hooks:
+            hook.before(phase, path)
+        try:
+            result = func(*args)
+        except Exception as e:
+            for hook in self.hooks:
+                hook.after(phase, path, e)
+            raise
+        for hook in self.hooks:
+            hook.after(phase, path)
+        return result
+
+    async def __run_phase_async(self, phase, path, func, *args):
+        for hook in self.hooks:
+            hook.before(phase, path)
+        try:
+            result = await func(*args)
+        except Exception as e:
+            for hook in self.hooks:
+                hook.after(phase, path, e)
+            raise
+        for hook in self.hooks:
+            hook.after(phase, path)
+        return result
+
+    def __call_instrumented(self, args):
+        cmd, cli_args, cli_kwargs = self.__resolve_instrumented(args)
+        return self.__run_phase('invoke', " ".join(cmd['path']), self.__invoke, cmd, cli_args, cli_kwargs)
+
+    def __resolve_instrumented(self, args):
+        cmd, cmd_args = self.__run_phase('resolve', None, self.__find_cmd, args)
+        cli_args, cli_kwargs = self.__run_phase('parse', " ".join(cmd['path']), cmd['parser'].parse, cmd_args)
+        return cmd, cli_args, cli_kwargs
+
+    def call_resolved(self, path, cli_args, cli_kwargs):
+        """ Call the command at path, the words of its definition, with already parsed arguments. """
+        if (cmd := self.__snapshot().get_path(path)) is None or not cmd.active:
+            if not self.__load_mounts(path) or (cmd := self.__snapshot().get_path(path)) is None or not cmd.active:
+                raise UnknownCommand(" ".join(path))
+        return self.__invoke_phase(" ".join(path), cmd, cli_args, cli_kwargs)
+
+    def __invoke(self, cmd, cli_args, cli_kwargs):
+        if self._profiler is not None:
+            self._profiler.dispatched()
+        if cmd.info.stream:
+            cli_args, cli_kwargs = self.__convert(cmd, cli_args, cli_kwargs)
+            output = check_format(cli_kwargs.pop('output', None) or 'text')
+            write_records(self.__call_handler(cmd, cli_args, cli_kwargs), output)
+            return None
+
+        cli_args, cli_kwargs = self.__convert(cmd, cli_args, cli_kwargs)
+        return self.__cached(cmd, cli_args, cli_kwargs, lambda: self.__call_handler(cmd, cli_args, cli_kwargs))
+
+    def __cached(self, cmd, cli_args, cli_kwargs, call):
+        """ Result of call(), taken from the command's cache when it has one. Used by every way of calling. """
+        if (cache := cmd.info.cache) is not None:
+            return cache.get_or_call(make_key(cmd.info.path, cli_args, cli_kwargs), call)
+        return call()
+
+    def invalidate_cache(self, args):
+        """ Drop the cached result of calling args, if the command has a cache. """
+        cmd, cli_args, cli_kwargs = self.__resolve(list(filter(None, args)))
+        cli_args, cli_kwargs = self.__convert(cmd, cli_args, cli_kwargs)
+        if (cache := cmd['cache']) is not None:
+            cache.invalidate(make_key(cmd['path'], cli_args, cli_kwargs))
+
+    def clear_caches(self):
+        """ Drop all cached results of all commands. """
+        for _path, cmd in self.get_cmds():
+            if (cache := cmd['cache']) is not None:
+                cache.clear()
+
+    def __convert(self, cmd, cli_args, cli_kwargs, offset=0):
+        """ Arguments converted according to the handler's annotations, the converter is built on first call.
+
+        With offset cli_args start at that positional parameter of the handler.
+        """
+        if self.defaults is not None and (defaults := self.defaults.for_cmd(cmd)):
+            cli_kwargs = {**defaults, **cli_kwargs}
+        if (converter := cmd.info.converter) is None:
+            converter = build_converter(cmd.handler()) or False
+            if converter and converter.lazy is not None and cmd.info.cache is not None:
+                # The iterator would be part of the cache key, which then never matches.
+                raise CommanderError(f"'{cmd.info.usage}': cache is not supported for lazily iterated arguments")
+            cmd.info.converter = converter
+        if converter and converter.lazy is not None and converter.lazy >= offset:
+            cli_args = cmd.info.parser.expand(cli_args, converter.lazy - offset)
+        elif type(cli_args) is StreamedArgs:
+            cli_args = cmd.info.parser.expand(cli_args)
+        if converter:
+            return converter.convert(cli_args, cli_kwargs, offset)
+        return cli_args, cli_kwargs
+
+    def pipeline(self, *stages):
+        """ Run commands as a pipeline in this process, like a shell pipe but passing python objects.
+
+        stages are argvs or command line strings, or a single string with the stages separated by |. All stages
+        are resolved before any is called. The handler of every stage after the first gets the result of the
+        previous stage, usually a generator, as its first argument followed by its own arguments, so records
+        stream through all stages one at a time. Returns the result of the last stage, or writes it to stdout
+        when that command was added with stream=True. Only the first stage can be served from its cache, the others
+        depend on the result passed to them.
+        """
+        if len(stages) == 1 and isinstance(stages[0], str):
+            stages = split_pipeline(stages[0])
+        resolve = self.__resolve_instrumented if self.hooks else self.__resolve
+        resolved = [resolve([a for a in (shlex.split(s) if isinstance(s, str) else s) if a]) for s in stages]
+        if self.hooks:
+            # Records stream through all stages at once, the whole pipeline is timed as one invoke.
+            path = " | ".join(" ".join(cmd.info.path) for cmd, _cli_args, _cli_kwargs in resolved)
+            return self.__run_phase('invoke', path, self.__run_pipeline, resolved)
+        return self.__run_pipeline(resolved)
+
+    def __run_pipeline(self, resolved):
+        if self._profiler is not None:
+            self._profiler.dispatched()
+        result = output = None
+        for i, (cmd, cli_args, cli_kwargs) in enumerate(resolved):
+            cli_args, cli_kwargs = self.__convert(cmd, cli_args, cli_kwargs, offset=int(i > 0))
+            if cmd.info.stream:
+                output = check_format(cli_kwargs.pop('output', None) or 'text')
+            if i > 0:
+                result = self.__call_handler(cmd, [result, *cli_args], cli_kwargs)
+            else:
+                result = self.__cached(cmd, cli_args, cli_kwargs,
+                                       lambda: self.__call_handler(cmd, cli_args, cli_kwargs))
+
+        if output is not None and resolved[-1][0].info.stream:
+            write_records(result, output)
+            return None
+        return result
+
+    def __call_handler(self, cmd, cli_args, cli_kwargs):
+        result = cmd.handler()(*cli_args, **cli_kwargs)
+        if inspect.iscoroutine(result):
+            return asyncio.run(result)
+        return result
+
+    async def call_async(self, args=sys.argv[1:]):
+        """ Same as call, but awaits async handlers on the running event loop. """
+        if '--help' in args:
+            self.help(args)
+            return
+
+        args = list(filter(None, args))
+        if self.hooks:
+            cmd, cli_args, cli_kwargs = self.__resolve_instrumented(args)
+            return await self.__run_phase_async('invoke', " ".join(cmd.info.path), self.__invoke_async,
+                                                cmd, cli_args, cli_kwargs)
+        cmd, cli_args, cli_kwargs = self.__resolve(args)
+        return await self.__invoke_async(cmd, cli_args, cli_kwargs)
+
+    async def __invoke_async(self, cmd, cli_args, cli_kwargs):
+        if self._profiler is not None:
+            self._profiler.dispatched()
+        cli_args, cli_kwargs = self.__convert(cmd, cli_args, cli_kwargs)
+        output = check_format(cli_kwargs.pop('output', None) or 'text') if cmd.info.stream else None
+        # Async handlers can't have a cache, the result of a cached one is never awaitable.
+        result = self.__cached(cmd, cli_args, cli_kwargs, lambda: cmd.handler()(*cli_args, **cli_kwargs))
+        if inspect.isawaitable(result):
+            result = await result
+        if output is not None:
+            write_records(result, output)
+            return None
+        return result
+
+    def __resolve(self, args):
+        """ Command to call for args together with its parsed positional and keyword arguments. """
+        cmd, cmd_args = self.__find_cmd(args)
+        cli_args, cli_kwargs = cmd.info.parser.parse(cmd_args)
+        return cmd, cli_args, cli_kwargs
+
+    def __find_cmd(self, args):
         if (cmd_info := self.__get_cmd(args)):
-            cmd, cmd_args = cmd_info
-            cli_args = []
-            cli_kwargs = {}
-
-            for a in cmd_args:
-                if a.startswith('-'):
-                    # argument is a flag
-                    kw = a.lstrip('-').split("=")
-                    key = cmd['flag_mapping'].get(kw[0].replace("-", "_"))
-                    flag_expect_value = cmd['flags'].get(key)
-                    if flag_expect_value:
-                        cli_kwargs[key] = get_idx(kw, 1)
-                    elif flag_expect_value is not None and not flag_expect_value:
-                        cli_kwargs[key] = True
-                    else:
-                        raise UnknownFlag
-                else:
-                    # just an basic argument, mandatory or optional who knows yet.
-                    cli_args.append(a)
+            return cmd_info
+        else:
+            # Suggestions are only looked up when shown, batches and servers mostly just count the error.
+            raise UnknownCommand(" ".join(args), suggestions=partial(self.__suggest_cmds, self.__snapshot(), args))
+
+    def suggest_cmds(self, args, limit=3):
+        """ Command paths close to the words in args.
+
+        The words are followed down the tree as far as they match, the first word that doesn't is compared to the
+        subcommands on that level, through an index built on first use per level. When none is close and the level
+        takes a parameter the word is taken as its value. When all words matched (a group of commands like "queue")
+        its subcommands are suggested. Mounted commands that haven't been loaded yet are not looked into.
+        """
+        return self.__suggest_cmds(self.__snapshot(), args, limit)
+
+    def __suggest_cmds(self, cmd, args, limit=3):
+        matched = []
+        for word in (a for a in args if not a.startswith('-')):
+            if (sub_cmd := cmd.subcommands.get(word)) is None or sub_cmd.wildcard:
+                if names := suggest(self.__suggest_index(cmd), word, limit):
+                    return [" ".join((*matched, name)) for name in names]
+                if (sub_cmd := cmd.get_subcommand(word)) is None:
+                    return []
+            matched.append(word)
+            cmd = sub_cmd
+        # Parameters (wildcards) below a group are left to the missing argument error.
+        names = heapq.nsmallest(limit, (name for name, c in cmd.subcommands.items() if not c.wildcard))
+        return [" ".join((*matched, name)) for name in names]
+
+    def __suggest_index(self, cmd):
+        """ Index of the subcommand names of cmd, kept until the tree changes. """
+        if (entry := self._suggest_indexes.get(id(cmd))) is None or entry[0] is not cmd:
+            entry = self._suggest_indexes[id(cmd)] = (cmd, NGramIndex(
+                name for name, c in cmd.subcommands.items() if not c.wildcard))
+        return entry[1]
+
+    def call_many(self, argvs, threads=None, processes=None, chunksize=1, ordered=True, mp_context=None):
+        """ Call each argv (list or command line string) in turn, yielding a BatchResult per command.
+
+        Errors are reported in the result instead of stopping the batch. With threads=N or processes=N the commands
+        are parsed here but called on a pool of workers, chunksize commands at a time, and results are yielded in
+        order or as they complete when ordered is False. Process workers look the command up in their own copy of
+        the Commander so only the command path and parsed arguments are sent to them, mp_context is the
+        multiprocessing context (start method) of the pool.
+        """
+        if threads or processes:
+            from pyclicommander.parallel import call_many_parallel
+
+            yield from call_many_parallel(self, self.__resolve_many(argvs), threads, processes, chunksize, ordered,
+                                          mp_context)
+            return
+
+        for line_no, args in iter_argvs(argvs):
+            try:
+                yield BatchResult(line_no, args, self.call(args), None)
+            except Exception as e:
+                yield BatchResult(line_no, args, None, e)
 
-            cli_argument_count = len(cmd['params'])
-            if len(cli_args) < cli_argument_count:
+    def __resolve_many(self, argvs):
+        for line_no, args in iter_argvs(argvs):
+            try:
+                resolve = self.__resolve_instrumented if self.hooks else self.__resolve
+                cmd, cli_args, cli_kwargs = resolve(list(filter(None, args)))
+                yield line_no, args, (cmd['path'], cli_args, cli_kwargs, None)
+            except CommanderError as e:
+                yield line_no, args, (None, None, None, e)
+
+    async def call_many_async(self, argvs, limit=10):
+        """ Async version of call_many, running up to limit commands concurrently on the event loop.
+
+        Results are yielded in the same order as argvs.
+        """
+        async def batch_result(line_no, args, task):
+            try:
+                return BatchResult(line_no, args, await task, None)
+            except Exception as e:
+                return BatchResult(line_no, args, None, e)
+
+        pending = deque()
+        try:
+            for line_no, args in iter_argvs(argvs):
+                pending.append((line_no, args, asyncio.ensure_future(self.call_async(args))))
+                if len(pending) >= limit:
+                    yield await batch_result(*pending.popleft())
+            while pending:
+                yield await batch_result(*pending.popleft())
+        finally:
+            for _line_no, _args, task in pending:
+                task.cancel()
+
+    def __call_batch(self, args):
+        """ --batch FILE or --batch=FILE, "-" reads command lines from stdin. Returns number of failed lines. """
+        _flag, _, batch_file = args[0].partition('=')
+        if not batch_file:
+            if len(args) < 2:
                 raise MissingMandatoryArgument
+            batch_file = args[1]
 
-            for op, count in cmd['optional_params']:
-                if count == '*':
-                    cli_argument_count = None
-                else:
-                    cli_argument_count += count
+        try:
+            opened = nullcontext(sys.stdin) if batch_file == '-' else open(batch_file)
+        except OSError as e:
+            raise ArgumentFileError(f"{batch_file}: {e.strerror or e}", param='batch', path=batch_file) from e
 
-            if cli_argument_count is not None and len(cli_args) > cli_argument_count:
-                raise UnknownArgument
+        failed = 0
+        with opened as f:
+            for batch_result in self.call_many(f):
+                if batch_result.error is not None:
+                    failed += 1
+                    print(f"line {batch_result.line}: {format_error(batch_result.error)}", file=sys.stderr)
+        return failed
 
-            return cmd['func'](*cli_args, **cli_kwargs)
-        else:
-            raise UnknownCommand
+    def __call_repeat(self, args):
+        """ --every=SECONDS [--count=N] [--diff] before the command, repeats it until interrupted or count runs. """
+        options = {'count': None, 'diff': False}
+        while args and (name := args[0].partition('=')[0]) in ('--every', '--count', '--diff'):
+            key = name[2:]
+            if key == 'diff':
+                options['diff'] = True
+                args = args[1:]
+                continue
+            _flag, _, value = args[0].partition('=')
+            if not value:
+                if len(args) < 2:
+                    raise MissingMandatoryArgument
+                value = args[1]
+                args = args[1:]
+            args = args[1:]
+            try:
+                options[key] = float(value) if key == 'every' else int(value)
+            except ValueError:
+                raise InvalidArgumentValue(f"{key}: invalid value {value!r}", param=key) from None
+        _check_every(options.get('every'))
+
+        result = None
+        try:
+            for result in self.repeat(args, **options):
+                pass
+        except KeyboardInterrupt:
+            pass
+        return result
+
+    def repeat(self, args, every, count=None, diff=False, clock=None, sleep=None):
+        """ Call args every so many seconds, count times or forever, yielding the result of each run.
+
+        args are resolved and parsed once, the same handler is called again on a fixed schedule, runs taking longer
+        than every skip the missed turns rather than drifting. With diff the output of a run is captured and only
+        printed as a diff against the previous run. clock and sleep default to time.monotonic and time.sleep.
+        """
+        _check_every(every)
+        return self.__repeat(args, every, count, diff, clock, sleep)
+
+    def __repeat(self, args, every, count, diff, clock, sleep):
+        clock = clock or time.monotonic
+        sleep = sleep or time.sleep
+        cmd, cli_args, cli_kwargs = self.__resolve(list(filter(None, args)))
+        path = " ".join(cmd.info.path)
+        previous = None
+        start = clock()
+        run = turn = 0
+        while count is None or run < count:
+            if run:
+                # Next turn on the schedule that is still ahead, so slow runs don't shift the following ones.
+                turn = max(turn + 1, int((clock() - start) / every) + 1)
+                sleep(max(0.0, start + turn * every - clock()))
+            run += 1
+
+            # Copies of the same type, response files (StreamedArgs) are read again on each run.
+            invoke_args = (cmd, type(cli_args)(cli_args), dict(cli_kwargs))
+            if not diff:
+                yield self.__invoke_phase(path, *invoke_args)
+                continue
+
+            with redirect_stdout(io.StringIO()) as output:
+                result = self.__invoke_phase(path, *invoke_args)
+            text = output.getvalue()
+            if previous is None:
+                sys.stdout.write(text)
+            else:
+                sys.stdout.writelines(difflib.unified_diff(previous.splitlines(keepends=True),
+                                                           text.splitlines(keepends=True),
+                                                           f"run {run - 1}", f"run {run}"))
+            sys.stdout.flush()
+            previous = text
+            yield result
+
+    def __invoke_phase(self, path, cmd, cli_args, cli_kwargs):
+        if self.hooks:
+            return self.__run_phase('invoke', path, self.__invoke, cmd, cli_args, cli_kwargs)
+        return self.__invoke(cmd, cli_args, cli_kwargs)
+
+    def serve(self, socket_path, workers=4):
+        """ Serve commands on a unix domain socket until interrupted, see pyclicommander.client for the client. """
+        from pyclicommander.server import CommanderServer
+
+        with CommanderServer(self, socket_path, workers) as server:
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
 
     def help(self, args=sys.argv[1:]):
+        if self.hooks:
+            return self.__run_phase('help', None, self.__help, args)
+        return self.__help(args)
+
+    def __help(self, args):
         if cmd_info := self.__get_cmd(args):
-            cmd, _args = cmd_info
-            if usage_help := cmd['usage']:
-                cmd_root_name = f"{self.cmd_name} " if self.cmd_name else ''
-                print(f"Usage: {cmd_root_name}{usage_help}")
-
-            if short_help := cmd['short_description']:
-                print(short_help)
-
-            if long_help := cmd['long_description']:
-                print(long_help)
-
-            if cmd.subcommands:
-                print()
-                print('Subcommands:')
-                for sub_cmd in cmd.subcommands.values():
-                    sub_short_description_text = str(sub_cmd['short_description'] or '')
-                    print(f"\t{sub_cmd.name()}\t{sub_short_description_text}")
+            print(self.__render_help(cmd_info[0]))
         else:
             print("no help?")
 
+    def __render_help(self, cmd):
+        """ Help text of an active command, rendered once and kept with the command. """
+        if (text := cmd.info.help) is not None:
+            return text
+
+        lines = []
+        if usage_help := cmd['usage']:
+            cmd_root_name = f"{self.cmd_name} " if self.cmd_name else ''
+            lines.append(f"Usage: {cmd_root_name}{usage_help}")
+
+        if short_help := cmd['short_description']:
+            lines.append(short_help)
+
+        if long_help := cmd['long_description']:
+            lines.append(long_help)
+
+        if cmd.subcommands:
+            lines.append('')
+            lines.append('Subcommands:')
+            for sub_cmd in cmd.subcommands.values():
+                sub_short_description_text = str(sub_cmd['short_description'] or '')
+                lines.append(f"\t{sub_cmd.name()}\t{sub_short_description_text}")
+        cmd.info.help = text = "\n".join(lines)
+        return text
+
     def help_all_commands(self, path=None):
+        """ Print the usage and short description of all commands, or only those below path (command words). """
+        words = tuple(path.split() if isinstance(path, str) else path or ())
+        root = self.__snapshot()
+        if (listing := self._listings.get(words)) is None or listing[0] is not root:
+            self.__load_mounts(words)
+            self.__load_subtree_mounts(words)
+            root = self.__snapshot()
+            listing = self._listings[words] = (root, self.__render_listing(root.get_path(words)))
+        if text := listing[1]:
+            print(text)
+
+    def __render_listing(self, cmd):
+        if cmd is None:
+            return ''
         cmd_root_name = f"{self.cmd_name} " if self.cmd_name else ''
-        for cmd, cmd_info in self.get_cmds():
-            print(f"{cmd_root_name}{cmd_info['usage']}")
-            if text := cmd_info['short_description']:
-                print(f"\t{text}")
+        lines = []
+        pending = [cmd]
+        while pending:
+            cmd = pending.pop()
+            if cmd.active:
+                lines.append(f"{cmd_root_name}{cmd['usage']}")
+                if text := cmd['short_description']:
+                    lines.append(f"\t{text}")
+            pending.extend(reversed(cmd.subcommands.values()))
+        return "\n".join(lines)
 
     def call_with_help(self, args=sys.argv[1:]):
         try:
             return self.call(args)
         except MissingMandatoryArgument:
             print("Missing mandatory argument...")
-        except UnknownFlag:
+        except UnknownFlag as e:
             print("Unknown flag passed...")
+            self.__print_suggestions(e)
         except UnknownArgument:
             print("Unknown argument passed...")
-        except UnknownCommand:
+        except UnknownCommand as e:
             print("Unknown command...")
+            self.__print_suggestions(e)
+        except InvalidArgumentValue as e:
+            print(e)
         self.help(args)
 
+    def __print_suggestions(self, error):
+        if error.suggestions:
+            print(f"Did you mean: {', '.join(error.suggestions)}?")
+
     def get_cmds(self):
         yield from self.__get_cmds()
 
     def __get_cmds(self):
+        self.load_mounts()
+
         def __recursive_get_cmd(cmd, path):
             path = f"{path} {cmd.name()}".strip()
             if cmd.active:
@@ -270,4 +1145,4 @@ class Commander():
             for s in cmd.subcommands.values():
                 yield from __recursive_get_cmd(s, path)
 
-        yield from __recursive_get_cmd(self.cmd, "")
+        yield from __recursive_get_cmd(self.__snapshot(), "")
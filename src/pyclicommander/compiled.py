@@ -0,0 +1,47 @@
+class CompiledTree:
+    """ Frozen lookup structure of a Cmd tree.
+
+    All nodes are stored in flat arrays indexed by position. Every node has a dict of its exact-match
+    children and a precomputed index to its wildcard child, so resolving a cli path is O(depth).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.nodes = [root]
+        self.children = []
+        self.wildcards = []
+
+        i = 0
+        while i < len(self.nodes):
+            exact = {}
+            wildcard = -1
+            for name, sub_cmd in self.nodes[i].subcommands.items():
+                idx = len(self.nodes)
+                self.nodes.append(sub_cmd)
+                if sub_cmd.wildcard:
+                    wildcard = idx
+                else:
+                    exact[name] = idx
+            self.children.append(exact)
+            self.wildcards.append(wildcard)
+            i += 1
+
+    def get_cmd(self, args):
+        """ Resolve args to (cmd, cmd_args), cmd_args being the wildcard words and what is left of args. """
+        children = self.children
+        wildcards = self.wildcards
+        nodes = self.nodes
+        idx = 0
+        cmd_args = []
+        for i, word in enumerate(args):
+            if word.startswith('-') or (sub_idx := children[idx].get(word, wildcards[idx])) < 0:
+                # matched as far as possible, what is left are arguments to the cmd.
+                cmd_args += args[i:]
+                break
+            idx = sub_idx
+            if nodes[idx].wildcard:
+                cmd_args.append(word)
+
+        cmd = nodes[idx]
+        if cmd.active:
+            return cmd, cmd_args
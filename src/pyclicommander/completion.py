@@ -0,0 +1,123 @@
+""" Shell completion from a precomputed index, answering without importing the Commander or any handlers.
+
+    $ python -m pyclicommander.completion INDEX_FILE -- queue li
+    list
+"""
+import marshal
+import os
+import sys
+from bisect import bisect_left
+from collections import deque
+
+INDEX_VERSION = 1
+
+# Index node fields.
+NAMES, CHILDREN, WILDCARD, FLAGS = range(4)
+
+
+def build_index(cmd):
+    """ Flat list of nodes (sorted subcommand names, their node indexes, wildcard node index, sorted flags). """
+    nodes = []
+    pending = deque([cmd])
+    while pending:
+        node_cmd = pending.popleft()
+        exact = sorted((name, sub_cmd) for name, sub_cmd in node_cmd.subcommands.items() if not sub_cmd.wildcard)
+        wildcard = [sub_cmd for sub_cmd in node_cmd.subcommands.values() if sub_cmd.wildcard]
+        first_child = len(nodes) + len(pending) + 1
+        nodes.append((
+            tuple(name for name, _sub_cmd in exact),
+            tuple(range(first_child, first_child + len(exact))),
+            first_child + len(exact) if wildcard else -1,
+            tuple(sorted(node_cmd['flag_names'] or ())) if node_cmd.active else (),
+        ))
+        pending.extend(sub_cmd for _name, sub_cmd in exact)
+        pending.extend(wildcard[-1:])
+    return nodes
+
+
+def save_index(cmd, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(marshal.dumps((INDEX_VERSION, build_index(cmd))))
+    os.replace(tmp_path, path)
+
+
+def load_index(path):
+    with open(path, 'rb') as f:
+        version, nodes = marshal.loads(f.read())
+    if version != INDEX_VERSION:
+        raise ValueError(f"{path}: unsupported completion index version {version}")
+    return nodes
+
+
+def _prefixed(sorted_words, prefix):
+    lo = bisect_left(sorted_words, prefix)
+    hi = bisect_left(sorted_words, prefix + '\U0010ffff', lo)
+    return sorted_words[lo:hi]
+
+
+def complete(nodes, words):
+    """ Candidates for the last of words, the previous words are the already completed part of the command line.
+
+    >>> complete(nodes, ["queue", "--q"])
+    ('--quiet',)
+    """
+    *done, prefix = words or ['']
+    node = nodes[0]
+    for word in done:
+        if word.startswith('-'):
+            continue
+        names = node[NAMES]
+        idx = bisect_left(names, word)
+        if idx < len(names) and names[idx] == word:
+            node = nodes[node[CHILDREN][idx]]
+        elif node[WILDCARD] >= 0:
+            node = nodes[node[WILDCARD]]
+        else:
+            # Not a command, nothing below it to complete.
+            return ()
+
+    if prefix.startswith('-'):
+        return _prefixed(node[FLAGS], prefix)
+    return _prefixed(node[NAMES], prefix)
+
+
+_SCRIPTS = {
+    'bash': """_{func}_complete() {{
+    local IFS=$'\\n'
+    COMPREPLY=($({python} -m pyclicommander.completion '{index}' -- "${{COMP_WORDS[@]:1:COMP_CWORD}}"))
+}}
+complete -o default -F _{func}_complete {prog}
+""",
+    'zsh': """#compdef {prog}
+_{func}_complete() {{
+    local -a candidates
+    candidates=("${{(@f)$({python} -m pyclicommander.completion '{index}' -- "${{(@)words[2,CURRENT]}}")}}")
+    compadd -- $candidates
+}}
+compdef _{func}_complete {prog}
+""",
+    'fish': """complete -c {prog} -f -a '({python} -m pyclicommander.completion \\'{index}\\' -- \
+(commandline -opc)[2..-1] (commandline -ct))'
+""",
+}
+
+
+def script(shell, prog, index_path, python=sys.executable):
+    """ Completion script for bash, zsh or fish, completing prog from the index at index_path. """
+    func = "".join(c if c.isalnum() else '_' for c in prog)
+    return _SCRIPTS[shell].format(prog=prog, func=func, index=index_path, python=python)
+
+
+def main(argv=None):
+    """ INDEX_FILE -- WORDS..., prints one candidate per line. """
+    argv = sys.argv[1:] if argv is None else argv
+    index_path, *rest = argv
+    words = rest[1:] if rest[:1] == ['--'] else rest
+    candidates = complete(load_index(index_path), words)
+    if candidates:
+        sys.stdout.write("\n".join(candidates) + "\n")
+
+
+if __name__ == "__main__":
+    main()
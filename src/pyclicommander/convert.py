@@ -0,0 +1,156 @@
+import collections.abc
+import enum
+import inspect
+import types
+import typing
+from functools import partial
+
+from pyclicommander.exceptions import InvalidArgumentValue
+
+# Callable types that don't convert a single string, list("ab") == ['a', 'b'], values are passed as they are.
+_CONTAINERS = (list, tuple, set, frozenset, dict, bytes, bytearray)
+
+# typing.Union and X | Y, which has its own type from python 3.10 on.
+_UNIONS = (typing.Union, getattr(types, 'UnionType', typing.Union))
+
+_TRUE = frozenset(('1', 'true', 'yes', 'on', 'y'))
+_FALSE = frozenset(('0', 'false', 'no', 'off', 'n'))
+
+
+def parse_bool(value):
+    """ Bool from a cli string.
+
+    >>> parse_bool("Yes")
+    True
+    """
+    if (lowered := value.lower()) in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _enum_converter(enum_cls):
+    def convert(value):
+        try:
+            return enum_cls[value]
+        except KeyError:
+            return enum_cls(value)
+    return convert
+
+
+def converter_for(annotation):
+    """ Function converting a cli string to annotation, None when the string should be passed as is. """
+    if annotation is inspect.Parameter.empty or annotation is str or annotation is typing.Any:
+        return None
+    if typing.get_origin(annotation) in _UNIONS:
+        # Optional[X] converts as X.
+        types = [t for t in typing.get_args(annotation) if t is not type(None)]
+        return converter_for(types[0]) if len(types) == 1 else None
+    if annotation is bool:
+        return parse_bool
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return _enum_converter(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, _CONTAINERS):
+        return None
+    if callable(annotation) and typing.get_origin(annotation) is None:
+        return annotation
+    return None
+
+
+def _lazy_element_type(annotation):
+    """ Element type when annotation asks for a lazy iterator (Iterable[X] or Iterator[X]), otherwise None. """
+    if typing.get_origin(annotation) in (collections.abc.Iterable, collections.abc.Iterator):
+        return (typing.get_args(annotation) or (str,))[0]
+    return None
+
+
+def _convert(name, convert, value):
+    try:
+        return convert(value)
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidArgumentValue(f"{name}: invalid value {value!r}", param=name) from e
+
+
+def _convert_all(name, convert, values):
+    """ Convert many values at once, only looking for the offending value when the conversion failed. """
+    try:
+        return list(map(convert, values))
+    except (ValueError, TypeError, KeyError):
+        for value in values:
+            _convert(name, convert, value)
+        raise
+
+
+class ArgumentConverter:
+    """ Converters for the positional, variadic and keyword parameters of a function, from its annotations.
+
+    lazy is the index of the positional parameter receiving the remaining arguments as an iterator, or None.
+    """
+    __slots__ = ('positional', 'variadic', 'keywords', 'lazy')
+
+    def __init__(self, positional, variadic, keywords, lazy=None):
+        self.positional = positional
+        self.variadic = variadic
+        self.keywords = keywords
+        self.lazy = lazy
+
+    def convert(self, cli_args, cli_kwargs, offset=0):
+        """ Converted arguments, with offset cli_args start at that positional parameter (the ones before it are
+        given some other way).
+        """
+        positional = self.positional[offset:] if offset else self.positional
+        lazy = None if self.lazy is None else self.lazy - offset
+        args = list(cli_args[:len(positional)])
+        for i, (name, convert) in enumerate(positional[:len(args)]):
+            if convert is None:
+                continue
+            if i == lazy:
+                args[i] = map(partial(_convert, name, convert), args[i])
+            else:
+                args[i] = _convert(name, convert, args[i])
+
+        if len(cli_args) > len(positional):
+            rest = cli_args[len(positional):]
+            if self.variadic is not None and self.variadic[1] is not None:
+                rest = _convert_all(*self.variadic, rest)
+            args.extend(rest)
+
+        kwargs = dict(cli_kwargs)
+        for key, value in cli_kwargs.items():
+            # Only values given as strings, not flags without value (True) or missing values (None).
+            if isinstance(value, str) and (convert := self.keywords.get(key)) is not None:
+                kwargs[key] = _convert(key, convert, value)
+        return args, kwargs
+
+
+def build_converter(func):
+    """ ArgumentConverter for func, None when none of its parameters are annotated with something to convert to. """
+    try:
+        signature = inspect.signature(func)
+        hints = typing.get_type_hints(func)
+    except (TypeError, ValueError, NameError):
+        return None
+
+    positional = []
+    variadic = None
+    keywords = {}
+    lazy = None
+    for name, param in signature.parameters.items():
+        annotation = hints.get(name, inspect.Parameter.empty)
+        if lazy is None and param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD) \
+                and (element_type := _lazy_element_type(annotation)) is not None:
+            lazy = len(positional)
+            positional.append((name, converter_for(element_type)))
+            continue
+        convert = converter_for(annotation)
+        if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+            positional.append((name, convert))
+        elif param.kind == param.VAR_POSITIONAL:
+            variadic = (name, convert)
+        if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY) and convert is not None:
+            keywords[name] = convert
+
+    if keywords or lazy is not None or any(convert for _name, convert in positional) or (variadic and variadic[1]):
+        return ArgumentConverter(tuple(positional), variadic, keywords, lazy)
+    return None
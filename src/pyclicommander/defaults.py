@@ -0,0 +1,86 @@
+import os
+from collections import ChainMap
+from types import MappingProxyType
+
+from pyclicommander.convert import parse_bool
+from pyclicommander.exceptions import InvalidArgumentValue
+from pyclicommander.utils import FrozenDict, deep_get
+
+_NO_DEFAULTS = MappingProxyType(FrozenDict())
+
+
+class Defaults:
+    """ Flag defaults per command path, from a config mapping overridden by environment variables.
+
+    The config is nested by command words, flag values set on a level apply to all commands below it:
+
+        {"timeout": 5, "queue": {"list": {"user": "bob"}}}
+
+    Environment variables are named after the prefix, command words and flag, e.g. APP_QUEUE_LIST_USER.
+    The flag values of each config level are collected once and shared, the defaults of a command are resolved
+    through a ChainMap of those levels on its first call and cached per path.
+    """
+
+    def __init__(self, config=None, env_prefix=None, environ=None):
+        self.config = config or {}
+        self.env_prefix = env_prefix
+        self.environ = environ
+        self._levels = {}
+        self._commands = {}
+
+    def __getstate__(self):
+        return {'config': self.config, 'env_prefix': self.env_prefix, 'environ': self.environ}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def reset(self):
+        """ Forget resolved defaults, e.g. when the environment or commands changed. """
+        self._commands.clear()
+
+    def for_cmd(self, cmd):
+        """ Read-only mapping of flag key => default value for cmd. """
+        info = cmd.info
+        if (defaults := self._commands.get(info.path)) is None:
+            defaults = self._commands[info.path] = self.__resolve(info)
+        return defaults
+
+    def __level(self, words):
+        """ Flag values set directly on the config section of words, shared by all commands below it. """
+        if (level := self._levels.get(words)) is None:
+            section = deep_get(self.config, list(words))
+            level = self._levels[words] = {
+                key.replace('-', '_'): value for key, value in section.items() if not isinstance(value, dict)
+            } if isinstance(section, dict) else {}
+        return level
+
+    def __resolve(self, info):
+        if not info.flags:
+            return _NO_DEFAULTS
+        words = tuple(w for w in info.path if not w[0].isupper())
+        chain = ChainMap(self.__env(words, info), *(self.__level(words[:i]) for i in range(len(words), -1, -1)))
+        defaults = {}
+        for alias, key in info.flag_mapping.items():
+            if key not in defaults and (value := chain.get(alias)) is not None:
+                defaults[key] = value
+        return MappingProxyType(defaults) if defaults else _NO_DEFAULTS
+
+    def __env(self, words, info):
+        if self.env_prefix is None:
+            return {}
+        environ = os.environ if self.environ is None else self.environ
+        prefix = "_".join((self.env_prefix, *words)).upper().replace('-', '_')
+        env = {}
+        for alias, key in info.flag_mapping.items():
+            if (value := environ.get(name := f"{prefix}_{alias.upper()}")) is None:
+                continue
+            if info.flags[key]:
+                env[alias] = value
+                continue
+            # Flags without a value are switched on or off.
+            try:
+                env[alias] = parse_bool(value)
+            except ValueError:
+                raise InvalidArgumentValue(f"{name}: invalid value {value!r}, expected true or false",
+                                           param=key) from None
+        return env
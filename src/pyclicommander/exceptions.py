@@ -1,5 +1,18 @@
 class CommanderError(Exception):
-    pass
+    def __init__(self, *args, suggestions=()):
+        super().__init__(*args)
+        # "did you mean" alternatives for unknown commands and flags, or a function finding them when first asked for.
+        self._suggestions = suggestions
+
+    @property
+    def suggestions(self):
+        if not isinstance(self._suggestions, list):
+            self._suggestions = list(self._suggestions() if callable(self._suggestions) else self._suggestions)
+        return self._suggestions
+
+    def __reduce__(self):
+        # Sent between processes with the suggestions found, not the function finding them.
+        return type(self), self.args, {**self.__dict__, '_suggestions': self.suggestions}
 
 
 class MissingMandatoryArgument(CommanderError):
@@ -16,3 +29,21 @@ class UnknownArgument(CommanderError):
 
 class UnknownCommand(CommanderError):
     pass
+
+
+class CommandConflict(CommanderError):
+    pass
+
+
+class InvalidArgumentValue(CommanderError):
+    def __init__(self, *args, param=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Name of the parameter the value was given for.
+        self.param = param
+
+
+class ArgumentFileError(InvalidArgumentValue):
+    def __init__(self, *args, path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Response file that couldn't be read.
+        self.path = path
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+
+class Hook:
+    """ Instrumentation hook, called around the resolve, parse, invoke and help phases of a Commander.
+
+    path is the command path ("queue list") when known, None for resolve and help.
+    """
+
+    def before(self, phase, path):
+        pass
+
+    def after(self, phase, path, error=None):
+        pass
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class StatsCollector(Hook):
+    """ Collects timings per phase, call counts per command path and error counts per exception type. """
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.phases = {}
+        self.calls = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+        # Start times of the phases in progress, per thread and per asyncio task.
+        self._starts = ContextVar(f"starts_{id(self)}", default=())
+
+    def before(self, phase, path):
+        self._starts.set((*self._starts.get(), self.clock()))
+
+    def after(self, phase, path, error=None):
+        *starts, start = self._starts.get()
+        self._starts.set(tuple(starts))
+        elapsed_ns = self.clock() - start
+        with self._lock:
+            stats = self.phases.setdefault(phase, {'count': 0, 'total_ns': 0, 'max_ns': 0})
+            stats['count'] += 1
+            stats['total_ns'] += elapsed_ns
+            stats['max_ns'] = max(stats['max_ns'], elapsed_ns)
+            if phase == 'invoke':
+                self.calls[path] += 1
+            if error is not None:
+                self.errors[type(error).__name__] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'phases': {phase: dict(stats) for phase, stats in self.phases.items()},
+                'calls': dict(self.calls),
+                'errors': dict(self.errors),
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def to_prometheus(self, prefix="pyclicommander"):
+        """ Stats in the prometheus text exposition format. """
+        stats = self.to_dict()
+        lines = [
+            f"# TYPE {prefix}_phase_calls_total counter",
+            *(f'{prefix}_phase_calls_total{{phase="{p}"}} {s["count"]}' for p, s in stats['phases'].items()),
+            f"# TYPE {prefix}_phase_seconds_total counter",
+            *(f'{prefix}_phase_seconds_total{{phase="{p}"}} {s["total_ns"] / 1e9}' for p, s in stats['phases'].items()),
+            f"# TYPE {prefix}_phase_seconds_max gauge",
+            *(f'{prefix}_phase_seconds_max{{phase="{p}"}} {s["max_ns"] / 1e9}' for p, s in stats['phases'].items()),
+            f"# TYPE {prefix}_command_calls_total counter",
+            *(f'{prefix}_command_calls_total{{path="{_escape_label(path)}"}} {count}'
+              for path, count in stats['calls'].items()),
+            f"# TYPE {prefix}_errors_total counter",
+            *(f'{prefix}_errors_total{{type="{error}"}} {count}' for error, count in stats['errors'].items()),
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix="pyclicommander"):
+        """ Write stats to a file for the node exporter textfile collector, replaced atomically. """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
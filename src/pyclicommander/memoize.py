@@ -0,0 +1,126 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(path, cli_args, cli_kwargs):
+    """ Cache key of a command call, kwargs sorted so flag order doesn't matter. """
+    return tuple(path), tuple(cli_args), tuple(sorted(cli_kwargs.items()))
+
+
+class ResultCache:
+    """ LRU cache of command results, entries older than ttl seconds are evicted.
+
+    With a path the results are also stored in a sqlite database so they survive between processes,
+    results must then be picklable.
+    """
+
+    def __init__(self, maxsize=128, ttl=None, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = None
+
+    def __getstate__(self):
+        # Sent to process workers without the connection, lock or cached results.
+        return {'maxsize': self.maxsize, 'ttl': self.ttl, 'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def config(self):
+        """ Arguments to create an equal (but empty) cache with. """
+        return self.maxsize, self.ttl, self.path
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def get_or_call(self, key, func):
+        """ Cached result for key, otherwise call func and cache its result. """
+        with self._lock:
+            found, value = self.get(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = func()
+        self.set(key, value)
+        return value
+
+    def get(self, key):
+        """ (True, result) if key is cached, otherwise (False, None). """
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return True, value
+                del self._entries[key]
+
+            if self.path and (row := self.__db().execute(
+                    "SELECT value FROM results WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                    (repr(key), time.time())).fetchone()):
+                value = pickle.loads(row[0])
+                self.__set_memory(key, value)
+                return True, value
+        return False, None
+
+    def set(self, key, value):
+        with self._lock:
+            self.__set_memory(key, value)
+            if self.path:
+                db = self.__db()
+                with db:
+                    db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                               (repr(key), self.__expires(time.time()), time.time(), pickle.dumps(value)))
+                    db.execute("DELETE FROM results WHERE key NOT IN "
+                               "(SELECT key FROM results ORDER BY stored DESC LIMIT ?)", (self.maxsize,))
+
+    def __set_memory(self, key, value):
+        self._entries[key] = (self.__expires(time.monotonic()), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __expires(self, now):
+        return None if self.ttl is None else now + self.ttl
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.path:
+                with self.__db() as db:
+                    db.execute("DELETE FROM results WHERE key = ?", (repr(key),))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                with self.__db() as db:
+                    db.execute("DELETE FROM results")
+
+    def __db(self):
+        if self._db is None:
+            import sqlite3
+
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            with self._db:
+                self._db.execute("CREATE TABLE IF NOT EXISTS results "
+                                 "(key TEXT PRIMARY KEY, expires REAL, stored REAL, value BLOB)")
+        return self._db
+
+
+def make_result_cache(cache):
+    """ ResultCache from the cache= option, True for the defaults or an int for maxsize. """
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return ResultCache()
+    if isinstance(cache, int):
+        return ResultCache(maxsize=cache)
+    return cache
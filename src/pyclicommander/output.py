@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+
+from pyclicommander.exceptions import InvalidArgumentValue
+
+FORMATS = ('text', 'jsonl', 'csv')
+
+
+def _text_encoder():
+    def encode(record):
+        if isinstance(record, str):
+            return record + "\n"
+        if isinstance(record, (list, tuple)):
+            return "\t".join(map(str, record)) + "\n"
+        return f"{record}\n"
+    return encode
+
+
+def _jsonl_encoder():
+    dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+    def encode(record):
+        return dumps(record) + "\n"
+    return encode
+
+
+class _Line:
+    """ File-like target for csv.writer, keeping the last written row. """
+    __slots__ = ('value',)
+
+    def write(self, s):
+        self.value = s
+
+
+def _csv_encoder():
+    import csv
+
+    line = _Line()
+    writer = csv.writer(line, lineterminator="\n")
+    header = None
+
+    def encode(record):
+        nonlocal header
+        if isinstance(record, dict):
+            prefix = ""
+            if header is None:
+                header = list(record)
+                writer.writerow(header)
+                prefix = line.value
+            writer.writerow([record.get(key) for key in header])
+            return prefix + line.value
+        writer.writerow(record if isinstance(record, (list, tuple)) else (record,))
+        return line.value
+    return encode
+
+
+_ENCODERS = {'text': _text_encoder, 'jsonl': _jsonl_encoder, 'csv': _csv_encoder}
+
+
+def check_format(output):
+    if output not in _ENCODERS:
+        raise InvalidArgumentValue(f"output: invalid value {output!r}, expected one of {', '.join(FORMATS)}",
+                                   param='output')
+    return output
+
+
+def write_records(records, output='text', stream=None, buffer_size=1 << 16):
+    """ Write records, the result of a command, to stream encoded as text lines, json lines or csv.
+
+    Records are pulled one at a time and written in chunks of about buffer_size characters. When the reader goes
+    away (broken pipe) writing stops and a generator is closed without pulling further records.
+    Returns False when the pipe was broken.
+    """
+    stream = sys.stdout if stream is None else stream
+    if records is None:
+        return True
+    if isinstance(records, (str, bytes, dict)) or not hasattr(records, '__iter__'):
+        records = (records,)
+
+    encode = _ENCODERS[check_format(output)]()
+    parts = []
+    size = 0
+    try:
+        for record in records:
+            part = encode(record)
+            parts.append(part)
+            size += len(part)
+            if size >= buffer_size:
+                stream.write("".join(parts))
+                parts = []
+                size = 0
+        if parts:
+            stream.write("".join(parts))
+        stream.flush()
+    except BrokenPipeError:
+        _discard_stdout(stream)
+        return False
+    finally:
+        if hasattr(records, 'close'):
+            records.close()
+    return True
+
+
+def _discard_stdout(stream):
+    # Python flushes stdout again at exit, which would fail on the broken pipe as well.
+    if stream is sys.__stdout__:
+        try:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, stream.fileno())
+            os.close(devnull)
+        except (OSError, ValueError):
+            pass
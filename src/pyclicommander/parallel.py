@@ -0,0 +1,84 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import islice
+
+from pyclicommander.batch import BatchResult
+
+# Commander of a process worker, set by the pool initializer.
+_worker_commander = None
+
+
+def _init_process_worker(commander):
+    global _worker_commander
+    _worker_commander = commander
+
+
+def _run_chunk_in_process(chunk):
+    return run_chunk(_worker_commander, chunk)
+
+
+def run_chunk(commander, chunk):
+    """ Call each (path, cli_args, cli_kwargs, error) in chunk, returns a (result, error) per call. """
+    results = []
+    for path, cli_args, cli_kwargs, error in chunk:
+        if error is None:
+            try:
+                results.append((commander.call_resolved(path, cli_args, cli_kwargs), None))
+            except Exception as e:
+                results.append((None, e))
+        else:
+            results.append((None, error))
+    return results
+
+
+def call_many_parallel(commander, resolved, threads=None, processes=None, chunksize=1, ordered=True,
+                       mp_context=None):
+    """ Call already resolved commands on a thread or process pool, yielding a BatchResult per command.
+
+    resolved is an iterable of (line_no, args, (path, cli_args, cli_kwargs, error)). At most two chunks per worker
+    are in flight at once so any number of commands run in constant memory. The Commander is pickled to process
+    workers (with any start method, see mp_context), handlers by import path where they can be imported.
+    """
+    if processes:
+        workers = processes
+        executor = ProcessPoolExecutor(processes, mp_context, initializer=_init_process_worker, initargs=(commander,))
+        run = _run_chunk_in_process
+    else:
+        workers = threads or os.cpu_count()
+        executor = ThreadPoolExecutor(workers)
+        run = partial(run_chunk, commander)
+
+    def chunk_results(lines, future):
+        for (line_no, args), (result, error) in zip(lines, future.result()):
+            yield BatchResult(line_no, args, result, error)
+
+    def drain_one():
+        if ordered:
+            yield from chunk_results(*pending.popleft())
+        else:
+            done, _not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from chunk_results(pending.pop(future), future)
+
+    resolved = iter(resolved)
+    pending = deque() if ordered else {}
+    with executor:
+        try:
+            while chunk := list(islice(resolved, chunksize)):
+                lines = [(line_no, args) for line_no, args, _call in chunk]
+                future = executor.submit(run, [call for _line_no, _args, call in chunk])
+                if ordered:
+                    pending.append((lines, future))
+                else:
+                    pending[future] = lines
+                if len(pending) >= workers * 2:
+                    yield from drain_one()
+
+            while pending:
+                yield from drain_one()
+        finally:
+            # Stopped early, don't start what is still queued.
+            for future in (future for _lines, future in pending) if ordered else pending:
+                future.cancel()
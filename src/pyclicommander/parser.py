@@ -0,0 +1,147 @@
+import sys
+from itertools import chain, islice
+
+from pyclicommander.suggest import BKTree, suggest
+from pyclicommander.utils import FrozenDict, get_idx
+from pyclicommander.exceptions import ArgumentFileError, MissingMandatoryArgument, UnknownFlag, UnknownArgument
+
+
+_NO_FLAGS = FrozenDict()
+
+
+class ArgumentFile:
+    """ Response file (@path) or stdin (-) standing in for positional arguments, one per non-empty line.
+
+    The file is only read when the arguments are iterated, line by line through a large buffer.
+    """
+    __slots__ = ('path',)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        if self.path == '-':
+            yield from _lines(sys.stdin)
+            return
+        try:
+            f = open(self.path, encoding='utf-8', buffering=1 << 20)
+        except OSError as e:
+            raise ArgumentFileError(f"@{self.path}: {e.strerror or e}", path=self.path) from e
+        with f:
+            yield from _lines(f)
+
+    def __repr__(self):
+        return f"ArgumentFile({self.path!r})"
+
+
+def _lines(f):
+    for line in f:
+        if line := line.rstrip('\r\n'):
+            yield line
+
+
+class StreamedArgs(list):
+    """ Positional arguments containing ArgumentFiles, expanded when the command is invoked. """
+    __slots__ = ()
+
+
+class CommandParser:
+    """ Argument parser for a single command, compiled once when the command is created.
+
+    The flag table maps every alias to (main_key, expects_value), min/max arity are plain ints
+    (max_args is None when there is a variadic parameter, files_from is then the position it starts at).
+    """
+    __slots__ = ('flag_names', 'flag_table', 'min_args', 'max_args', 'files_from', '_suggest_tree')
+
+    def __init__(self, params, optional_params, flags, flag_mapping, flag_names=()):
+        self.flag_names = flag_names
+        self._suggest_tree = None
+        self.flag_table = _NO_FLAGS
+        if flag_mapping:
+            self.flag_table = {alias: (key, flags[key]) for alias, key in flag_mapping.items()}
+            # Also accept the hyphenated spelling without having to normalize each token.
+            for alias, entry in list(self.flag_table.items()):
+                self.flag_table.setdefault(alias.replace("_", "-"), entry)
+
+        self.min_args = len(params)
+        self.max_args = self.min_args
+        self.files_from = None
+        for _param, count in optional_params:
+            if count == '*':
+                self.files_from = self.max_args
+                self.max_args = None
+                break
+            self.max_args += count
+
+    def suggest_flags(self, flag):
+        """ Flags of this command close to flag, the index is built on first use. """
+        if self._suggest_tree is None:
+            self._suggest_tree = BKTree(name.rstrip('=') for name in self.flag_names)
+        return suggest(self._suggest_tree, flag)
+
+    def lookup_flag(self, name):
+        return self.flag_table.get(name) or self.flag_table.get(name.replace("-", "_"))
+
+    def parse(self, args):
+        """ Split args into positional arguments and flag keyword arguments in a single pass.
+
+        Arguments of a variadic parameter given as @path or - (stdin) are returned as ArgumentFiles in StreamedArgs,
+        their arity is checked when they are expanded.
+        """
+        cli_args = []
+        cli_kwargs = {}
+        files_from = self.files_from
+        for a in args:
+            if (files_from is not None and len(cli_args) >= files_from
+                    and (a == '-' or (a.startswith('@') and a != '@'))):
+                # Response file for the variadic arguments, other values starting with @ are taken as they are.
+                if a.startswith('@@'):
+                    # Escaped literal argument starting with an @.
+                    cli_args.append(a[1:])
+                    continue
+                if type(cli_args) is list:
+                    cli_args = StreamedArgs(cli_args)
+                cli_args.append(ArgumentFile(a[1:] if a != '-' else a))
+            elif a.startswith('-'):
+                # argument is a flag
+                kw = a.lstrip('-').split("=")
+                if (flag := self.lookup_flag(kw[0])) is None:
+                    flag_name = a.split("=")[0]
+                    raise UnknownFlag(flag_name, suggestions=self.suggest_flags(flag_name))
+                key, flag_expect_value = flag
+                if flag_expect_value:
+                    cli_kwargs[key] = get_idx(kw, 1)
+                else:
+                    cli_kwargs[key] = True
+            else:
+                # just an basic argument, mandatory or optional who knows yet.
+                cli_args.append(a)
+
+        if type(cli_args) is list:
+            self.check_arity(cli_args)
+        return cli_args, cli_kwargs
+
+    def check_arity(self, cli_args):
+        if len(cli_args) < self.min_args:
+            raise MissingMandatoryArgument
+
+        if self.max_args is not None and len(cli_args) > self.max_args:
+            raise UnknownArgument
+
+    def expand(self, cli_args, lazy_index=None):
+        """ Positional arguments with the argument files read.
+
+        With lazy_index the arguments from that position on are left as a single iterator, so they can be consumed
+        in constant memory.
+        """
+        stream = chain.from_iterable((a,) if isinstance(a, str) else a for a in cli_args)
+        if lazy_index is None:
+            args = list(stream)
+            self.check_arity(args)
+            return args
+
+        args = list(islice(stream, lazy_index))
+        if len(args) < lazy_index:
+            raise MissingMandatoryArgument
+        args.append(stream)
+        return args
@@ -0,0 +1,196 @@
+""" Startup profiling, attributing import and registration time to modules and commands.
+
+Enabled by setting PYCLICOMMANDER_PROFILE to a json file path (or - for stderr) before the Commander is created,
+the report is written when the process exits:
+
+    $ PYCLICOMMANDER_PROFILE=startup.json python3 test_cli.py queue list
+"""
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+
+PROFILE_ENV = 'PYCLICOMMANDER_PROFILE'
+
+_profiler = None
+_lock = threading.Lock()
+
+
+def start(output=None):
+    """ Profiler of this process, started on first call. Imports are timed from then on. """
+    global _profiler
+    with _lock:
+        if _profiler is None:
+            _profiler = StartupProfiler(output)
+            _profiler.start()
+        return _profiler
+
+
+class _TimingLoader:
+    """ Loader timing the execution of a module, otherwise the same as the loader it wraps. """
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        try:
+            with self.profiler.importing(module.__name__):
+                self.loader.exec_module(module)
+        finally:
+            # Leave the module as if it was imported without profiling.
+            module.__loader__ = self.loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self.loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class _TimingFinder:
+    """ First entry of sys.meta_path, finding specs through the other finders and wrapping their loaders. """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or (find_spec := getattr(finder, 'find_spec', None)) is None:
+                continue
+            if (spec := find_spec(fullname, path, target)) is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimingLoader(spec.loader, self.profiler)
+                return spec
+        return None
+
+
+class _Importing:
+    __slots__ = ('profiler', 'module', 'start', 'children_ns')
+
+    def __init__(self, profiler, module):
+        self.profiler = profiler
+        self.module = module
+        self.children_ns = 0
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        stack.append(self)
+        self.start = self.profiler.clock()
+
+    def __exit__(self, *exc_info):
+        elapsed_ns = self.profiler.clock() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children_ns += elapsed_ns
+        self.profiler.imports[self.module] = (elapsed_ns - self.children_ns, elapsed_ns)
+
+
+class StartupProfiler:
+    """ Import time per module, registration time per command definition, compile time and time to dispatch. """
+
+    def __init__(self, output=None, clock=time.perf_counter_ns):
+        self.output = output
+        self.clock = clock
+        self.started_ns = clock()
+        # module => (self ns, cumulative ns)
+        self.imports = {}
+        # (module, definition, create ns, merge ns)
+        self.commands = []
+        self.compile_ns = 0
+        self.dispatch_ns = None
+        self._finder = _TimingFinder(self)
+        self._local = threading.local()
+
+    def _stack(self):
+        if (stack := getattr(self._local, 'stack', None)) is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        sys.meta_path.insert(0, self._finder)
+        if self.output:
+            atexit.register(self.finish)
+
+    def stop(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def finish(self):
+        """ Stop timing imports and write the report to output. """
+        global _profiler
+        self.stop()
+        atexit.unregister(self.finish)
+        with _lock:
+            if _profiler is self:
+                _profiler = None
+        if self.output == '-':
+            print(self.to_json(), file=sys.stderr)
+        elif self.output:
+            with open(self.output, 'w') as f:
+                f.write(self.to_json())
+
+    def importing(self, module):
+        return _Importing(self, module)
+
+    def command(self, definition, func, create_ns, merge_ns):
+        if isinstance(func, str):
+            module = func.partition(':')[0]
+        else:
+            module = getattr(func, '__module__', None)
+        self.commands.append((module, definition, create_ns, merge_ns))
+
+    def compiled(self, elapsed_ns):
+        self.compile_ns += elapsed_ns
+
+    def dispatched(self):
+        if self.dispatch_ns is None:
+            self.dispatch_ns = self.clock() - self.started_ns
+
+    def to_dict(self):
+        """ Report with totals, modules sorted by import plus registration time and commands by registration time. """
+        registered = defaultdict(list)
+        for module, definition, create_ns, merge_ns in self.commands:
+            registered[module].append((definition, create_ns + merge_ns))
+
+        modules = []
+        for module in set(self.imports) | set(registered):
+            self_ns, cumulative_ns = self.imports.get(module, (0, 0))
+            registration_ns = sum(ns for _definition, ns in registered.get(module, ()))
+            modules.append({
+                'module': module,
+                'import_ms': self_ns / 1e6,
+                'cumulative_import_ms': cumulative_ns / 1e6,
+                'registration_ms': registration_ns / 1e6,
+                'commands': [definition for definition, _ns in registered.get(module, ())],
+            })
+        modules.sort(key=lambda m: (-(m['import_ms'] + m['registration_ms']), m['module'] or ''))
+
+        commands = sorted(({
+            'definition': definition,
+            'module': module,
+            'create_ms': create_ns / 1e6,
+            'merge_ms': merge_ns / 1e6,
+        } for module, definition, create_ns, merge_ns in self.commands),
+            key=lambda c: (-(c['create_ms'] + c['merge_ms']), c['definition']))
+
+        return {
+            'totals': {
+                'import_ms': sum(self_ns for self_ns, _cumulative in self.imports.values()) / 1e6,
+                'create_ms': sum(c['create_ms'] for c in commands),
+                'merge_ms': sum(c['merge_ms'] for c in commands),
+                'compile_ms': self.compile_ns / 1e6,
+                'commands': len(commands),
+            },
+            'time_to_dispatch_ms': None if self.dispatch_ns is None else self.dispatch_ns / 1e6,
+            'modules': modules,
+            'commands': commands,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
@@ -0,0 +1,157 @@
+import io
+import os
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from pyclicommander.client import recv_frame, send_frame
+from pyclicommander.exceptions import CommanderError
+from pyclicommander.utils import format_error
+
+_local = threading.local()
+
+
+def current_request():
+    """ Request being handled by this thread, a dict with argv, cwd, env and stdin. None outside of the server.
+
+    cwd and env are those of the client, they are not applied to the server process since that is shared by all
+    requests.
+    """
+    return getattr(_local, 'request', None)
+
+
+def run_command(commander, argv):
+    """ Call argv and translate the outcome into an exit code. """
+    try:
+        result = commander.call(argv)
+    except CommanderError as e:
+        print(format_error(e), file=sys.stderr)
+        return 2
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return result if isinstance(result, int) and not isinstance(result, bool) else 0
+
+
+class _ThreadLocalStream:
+    """ Stand-in for sys.stdout/sys.stderr/sys.stdin, using the stream of the request handled by this thread. """
+
+    def __init__(self, name, default):
+        self._name = name
+        self._default = default
+
+    def _stream(self):
+        return getattr(_local, self._name, None) or self._default
+
+    def write(self, s):
+        return self._stream().write(s)
+
+    def flush(self):
+        return self._stream().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream(), name)
+
+
+class _FrameWriter(io.TextIOBase):
+    """ Text stream sending what is written as frames to the client, flushed per line. """
+
+    def __init__(self, sock, name, buffer_size=1 << 16):
+        self._sock = sock
+        self._name = name
+        self._buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        self._parts.append(s)
+        self._size += len(s)
+        if self._size >= self._buffer_size or '\n' in s:
+            self.flush()
+        return len(s)
+
+    def flush(self):
+        if self._parts:
+            data = ''.join(self._parts)
+            self._parts = []
+            self._size = 0
+            send_frame(self._sock, {'stream': self._name, 'data': data})
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        if (request := recv_frame(self.request)) is None:
+            return
+
+        stdout = _FrameWriter(self.request, 'stdout')
+        stderr = _FrameWriter(self.request, 'stderr')
+        _local.request = request
+        _local.stdout = stdout
+        _local.stderr = stderr
+        _local.stdin = io.StringIO(request.get('stdin') or '')
+        try:
+            exit_code = run_command(self.server.commander, request['argv'])
+        finally:
+            del _local.request, _local.stdout, _local.stderr, _local.stdin
+        stdout.flush()
+        stderr.flush()
+        send_frame(self.request, {'exit': exit_code})
+
+
+class CommanderServer(socketserver.UnixStreamServer):
+    """ Serve commands on a unix domain socket, requests are handled concurrently by a pool of worker threads. """
+
+    def __init__(self, commander, socket_path, workers=4):
+        self.commander = commander
+        self.socket_path = os.fspath(socket_path)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.__remove_stale_socket()
+        super().__init__(self.socket_path, _RequestHandler)
+
+    def __remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.socket_path)
+            except ConnectionRefusedError:
+                os.unlink(self.socket_path)
+            else:
+                raise CommanderError(f"a server is already listening on {self.socket_path}")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.__process_request_worker, request, client_address)
+
+    def __process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def serve_forever(self, poll_interval=0.5):
+        streams = sys.stdin, sys.stdout, sys.stderr
+        sys.stdin = _ThreadLocalStream('stdin', sys.stdin)
+        sys.stdout = _ThreadLocalStream('stdout', sys.stdout)
+        sys.stderr = _ThreadLocalStream('stderr', sys.stderr)
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = streams
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,130 @@
+from collections import Counter, defaultdict
+from itertools import chain
+
+
+def levenshtein(a, b, transpositions=False, max_distance=None):
+    """ Edit distance between a and b, optionally counting swapped neighbours as one edit.
+
+    Counting transpositions (optimal string alignment) breaks the triangle inequality, it can't be used in a BKTree.
+    With max_distance the comparison stops early, returning max_distance + 1, once the words are further apart.
+
+    >>> levenshtein("queue", "qeueu")
+    2
+    >>> levenshtein("lsit", "list", transpositions=True)
+    1
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+            if transpositions and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class BKTree:
+    """ Burkhard-Keller tree for finding words within an edit distance without comparing against every word. """
+
+    def __init__(self, words=()):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node_word, children = self.root
+        while (distance := levenshtein(word, node_word)) != 0:
+            if (child := children.get(distance)) is None:
+                children[distance] = (word, {})
+                return
+            node_word, children = child
+
+    def search(self, word, max_distance):
+        """ Words within max_distance of word as sorted (distance, word) tuples. """
+        found = []
+        pending = [self.root] if self.root else []
+        while pending:
+            node_word, children = pending.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance:
+                found.append((distance, node_word))
+            # Triangle inequality, only subtrees at these distances can have matches.
+            for child_distance in range(distance - max_distance, distance + max_distance + 1):
+                if (child := children.get(child_distance)) is not None:
+                    pending.append(child)
+        return sorted(found)
+
+
+class NGramIndex:
+    """ Words by the letter pairs they contain, for finding words within an edit distance among many siblings.
+
+    Building it is one pass over the letters, unlike a BKTree it needs no distance calculations. Words are compared
+    starting with the ones sharing most pairs with the searched word. An edit changes at most three pairs (a swap of
+    neighbours counts as one edit), which bounds how close the remaining words can be, so searching stops once the
+    closest ones were found or after max_compared comparisons on large indexes.
+    """
+    max_compared = 2000
+
+    def __init__(self, words=()):
+        self.words = []
+        self.sizes = []
+        self.pairs = defaultdict(list)
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        index = len(self.words)
+        self.words.append(word)
+        pairs = _pairs(word)
+        self.sizes.append(len(pairs))
+        for pair in pairs:
+            self.pairs[pair].append(index)
+
+    def search(self, word, max_distance, limit=None):
+        """ Words within max_distance of word as sorted (distance, word) tuples, the closest ones when limited. """
+        pairs = _pairs(word)
+        shared = Counter(chain.from_iterable(self.pairs.get(pair, ()) for pair in pairs))
+        # Words sharing no pairs can only be close when the searched word has few.
+        indexes = range(len(self.words)) if len(pairs) <= 3 * max_distance else shared
+        by_missing = defaultdict(list)
+        for i in indexes:
+            missing = max(len(pairs), self.sizes[i]) - shared.get(i, 0)
+            if missing <= 3 * max_distance and abs(len(self.words[i]) - len(word)) <= max_distance:
+                by_missing[missing].append(self.words[i])
+
+        found = []
+        compared = 0
+        for missing in sorted(by_missing):
+            bound = -(-missing // 3)
+            if limit is not None and sum(distance < bound for distance, _word in found) >= limit:
+                break
+            for candidate in by_missing[missing]:
+                if compared == self.max_compared:
+                    return sorted(found)
+                compared += 1
+                if (distance := levenshtein(word, candidate, True, max_distance)) <= max_distance:
+                    found.append((distance, candidate))
+        return sorted(found)
+
+
+def _pairs(word):
+    """ Distinct letter pairs of word, including its first and last letter paired with the word boundary. """
+    padded = f"\0{word}\0"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def suggest(index, word, limit=3):
+    """ Up to limit closest words in index (BKTree or NGramIndex), allowing roughly one typo per three characters. """
+    max_distance = max(1, len(word) // 3)
+    if isinstance(index, NGramIndex):
+        return [w for _distance, w in index.search(word, max_distance, limit)[:limit]]
+    return [w for _distance, w in index.search(word, max_distance)[:limit]]
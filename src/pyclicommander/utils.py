@@ -1,3 +1,16 @@
+import importlib
+import sys
+
+
+class FrozenDict(dict):
+    """ Read-only dict, used for empty dicts that are shared instead of allocated per object. """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+
 def intersperse(lst, item):
     """ Insert item inbetween each elemt in the list.
 
@@ -21,6 +34,8 @@ def deep_get(d, keys, default=None):
         return default
     if not keys:
         return d
+    if not isinstance(d, dict):
+        return default
     return deep_get(d.get(keys[0]), keys[1:], d.get(keys[0]))
 
 
@@ -69,3 +84,44 @@ def get_idx(lst, idx, default_value=None):
     "apa"
     """
     return lst[idx] if idx < len(lst) else default_value
+
+
+def import_string(import_path):
+    """ Import and return the object pointed out by a "pkg.module:attr" import path.
+
+    >>> import_string("os.path:join")
+    <function join at ...>
+    """
+    module_name, _, attr_path = import_path.partition(':')
+    obj = importlib.import_module(module_name)
+    for attr in filter(None, attr_path.split('.')):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def import_path_of(func):
+    """ "pkg.module:attr" import path giving func, or a wrapper of it (functools.wraps), None when there is none.
+
+    Only already imported modules are looked in.
+    """
+    module_name, qualname = getattr(func, '__module__', None), getattr(func, '__qualname__', '')
+    if (obj := sys.modules.get(module_name)) is None or '<' in qualname:
+        return None
+    for attr in qualname.split('.'):
+        if (obj := getattr(obj, attr, None)) is None:
+            return None
+    while obj is not func and (obj := getattr(obj, '__wrapped__', None)) is not None:
+        pass
+    return f"{module_name}:{qualname}" if obj is func else None
+
+
+def format_error(error):
+    """ One line description of an error, with suggestions when there are any.
+
+    >>> format_error(UnknownCommand("queue lst", suggestions=["queue list"]))
+    "UnknownCommand: queue lst (did you mean: queue list?)"
+    """
+    text = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+    if suggestions := getattr(error, 'suggestions', None):
+        text += f" (did you mean: {', '.join(suggestions)}?)"
+    return text
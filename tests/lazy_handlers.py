@@ -0,0 +1,11 @@
+""" Handlers registered by import path in the tests, must only be imported when called. """
+
+
+def status(name=None, verbose=False):
+    """ Show status. """
+    return "status", name, verbose
+
+
+async def fetch(key):
+    """ Fetch key. """
+    return "fetch", key
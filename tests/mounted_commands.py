@@ -0,0 +1,19 @@
+""" Commander mounted by import path in the tests, must only be imported when walked into. """
+from pyclicommander import Commander
+
+commander = Commander()
+
+
+@commander.cli("list [--user=U]")
+def list_(user=None):
+    """ List queue. """
+    return "list", user
+
+
+@commander.cli("accept KEY")
+def accept(key):
+    """ Accept key. """
+    return "accept", key
+
+
+commander.mount("jobs", "tests.nested_mounted_commands:commander")
@@ -0,0 +1,10 @@
+""" Commander mounted by tests.mounted_commands. """
+from pyclicommander import Commander
+
+commander = Commander()
+
+
+@commander.cli("run NAME")
+def run(name):
+    """ Run job. """
+    return "run", name
@@ -0,0 +1,16 @@
+""" Commander with @cli handlers for process workers that import instead of inherit it (spawn). """
+import os
+
+from pyclicommander import Commander
+
+commander = Commander()
+
+
+@commander.cli("square NUMBER")
+def square(number: int):
+    return number ** 2
+
+
+@commander.cli("pid")
+def pid():
+    return os.getpid()
@@ -0,0 +1,49 @@
+import asyncio
+import inspect
+import unittest
+from pyclicommander import Commander
+from pyclicommander.exceptions import UnknownCommand
+
+
+class Test_async(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+        self.running = 0
+        self.max_running = 0
+
+        @self.commander.cli("fetch KEY")
+        async def fetch(key):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            return key.upper()
+
+        @self.commander.cli("sync KEY")
+        def sync(key):
+            return key
+
+        self.fetch = fetch
+
+    def test_decorator_keeps_coroutine_function(self):
+        self.assertTrue(inspect.iscoroutinefunction(self.fetch))
+
+    def test_call_async(self):
+        self.assertEqual(asyncio.run(self.commander.call_async(["fetch", "apa"])), "APA")
+        self.assertEqual(asyncio.run(self.commander.call_async(["sync", "apa"])), "apa")
+
+        with self.assertRaises(UnknownCommand):
+            asyncio.run(self.commander.call_async(["unknown"]))
+
+    def test_call_runs_event_loop(self):
+        self.assertEqual(self.commander.call(["fetch", "apa"]), "APA")
+
+    def test_call_many_async(self):
+        async def run_batch():
+            argvs = [f"fetch key{i}" for i in range(10)] + ["unknown"]
+            return [r async for r in self.commander.call_many_async(argvs, limit=3)]
+
+        results = asyncio.run(run_batch())
+        self.assertEqual([r.result for r in results[:10]], [f"KEY{i}" for i in range(10)])
+        self.assertIsInstance(results[10].error, UnknownCommand)
+        self.assertEqual(self.max_running, 3)
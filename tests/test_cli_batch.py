@@ -0,0 +1,126 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.exceptions import ArgumentFileError, UnknownCommand, MissingMandatoryArgument
+from tests.parallel_commands import commander as decorated_commander
+
+
+class Test_batch(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+        self.calls = []
+
+        @self.commander.cli("speak WORD [--times=N]")
+        def speak(word, times=1):
+            self.calls.append(word)
+            return word * int(times)
+
+    def test_call_many(self):
+        results = list(self.commander.call_many([
+            "speak apa",
+            "",
+            "# comment",
+            ["speak", "bepa", "--times=2"],
+            "unknown",
+            "speak 'cepa depa'",
+        ]))
+
+        self.assertEqual([(r.line, r.result) for r in results], [
+            (1, "apa"),
+            (4, "bepabepa"),
+            (5, None),
+            (6, "cepa depa"),
+        ])
+        self.assertIsInstance(results[2].error, UnknownCommand)
+        self.assertEqual(results[3].args, ["speak", "cepa depa"])
+
+    def test_call_many_is_lazy(self):
+        results = self.commander.call_many(iter(["speak apa", "speak bepa"]))
+        self.assertEqual(next(results).result, "apa")
+        self.assertEqual(self.calls, ["apa"])
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_batch_file(self, mock_stderr):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            batch_file = os.path.join(tmp_dir, "batch.txt")
+            with open(batch_file, "w") as f:
+                f.write("speak apa\nspeak\nspeak bepa\n")
+
+            self.assertEqual(self.commander.call(["--batch", batch_file]), 1)
+            self.assertEqual(self.commander.call([f"--batch={batch_file}"]), 1)
+
+        self.assertEqual(self.calls, ["apa", "bepa", "apa", "bepa"])
+        self.assertEqual(mock_stderr.getvalue(), "line 2: UnknownCommand: speak\n" * 2)
+
+    @patch('sys.stdin', new_callable=lambda: io.StringIO("speak apa\nspeak bepa\n"))
+    def test_batch_stdin(self, _mock_stdin):
+        self.assertEqual(self.commander.call(["--batch", "-"]), 0)
+        self.assertEqual(self.calls, ["apa", "bepa"])
+
+        with self.assertRaises(MissingMandatoryArgument):
+            self.commander.call(["--batch"])
+
+    @patch('builtins.print')
+    def test_batch_file_missing(self, mock_print):
+        with self.assertRaises(ArgumentFileError) as cm:
+            self.commander.call(["--batch", "/nonexistent/batch.txt"])
+        self.assertEqual(cm.exception.path, "/nonexistent/batch.txt")
+        self.commander.call_with_help(["--batch", "/nonexistent/batch.txt"])
+        self.assertIn("/nonexistent/batch.txt", str(mock_print.mock_calls[0].args[0]))
+
+    def test_root_command_flag(self):
+        @self.commander.cli("[--batch=X]")
+        def root(batch=None):
+            return "root", batch
+
+        self.assertEqual(self.commander.call(["--batch=x"]), ("root", "x"))
+
+
+def square(number):
+    return int(number) ** 2
+
+
+def worker_pid():
+    return os.getpid()
+
+
+class Test_batch_parallel(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+        self.commander.add_cli("square NUMBER", square)
+        self.commander.add_cli("pid", worker_pid)
+        self.argvs = [f"square {i}" for i in range(20)] + ["unknown", "square"]
+
+    def check_results(self, results, ordered=True):
+        if not ordered:
+            results = sorted(results, key=lambda r: r.line)
+        self.assertEqual([r.result for r in results[:20]], [i ** 2 for i in range(20)])
+        self.assertEqual([r.line for r in results], list(range(1, 23)))
+        self.assertIsInstance(results[20].error, UnknownCommand)
+        self.assertIsInstance(results[21].error, UnknownCommand)
+
+    def test_threads(self):
+        self.check_results(list(self.commander.call_many(self.argvs, threads=4)))
+        self.check_results(list(self.commander.call_many(self.argvs, threads=4, chunksize=3, ordered=False)), False)
+
+    def test_processes(self):
+        self.check_results(list(self.commander.call_many(self.argvs, processes=2, chunksize=5)))
+
+        pids = {r.result for r in self.commander.call_many(["pid"] * 4, processes=2)}
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_spawned_processes(self):
+        # Workers unpickle the Commander in a fresh interpreter, @cli handlers are imported by path.
+        spawn = multiprocessing.get_context("spawn")
+        results = list(decorated_commander.call_many(self.argvs, processes=2, chunksize=5, mp_context=spawn))
+        self.check_results(results)
+        pids = {r.result for r in decorated_commander.call_many(["pid"] * 2, processes=2, mp_context=spawn)}
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_handler_error(self):
+        results = list(self.commander.call_many(["square apa"], threads=2))
+        self.assertIsInstance(results[0].error, ValueError)
@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+import unittest
+from pyclicommander import bench
+
+
+class Test_bench(unittest.TestCase):
+    def test_run_benchmarks(self):
+        results = bench.run_benchmarks(sizes=[20], shapes=list(bench.SHAPES))
+
+        self.assertEqual([(r['shape'], r['commands']) for r in results['results']],
+                         [(shape, 20) for shape in bench.SHAPES])
+        for result in results['results']:
+            for phase in ('register', 'compile', 'resolve', 'call', 'help', 'help_all_commands'):
+                self.assertGreater(result[phase]['total_s'], 0)
+            self.assertGreater(result['memory']['peak_bytes'], 0)
+
+    def test_shapes_resolve(self):
+        for shape, tree in bench.SHAPES.items():
+            commander = bench.Commander()
+            definitions = tree(100)
+            for definition, _argv in definitions:
+                commander.add_cli(definition, bench._handler)
+            for _definition, argv in definitions:
+                self.assertIsNotNone(commander._Commander__get_cmd(argv), shape)
+
+    def test_json_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_file = os.path.join(tmp_dir, "results.json")
+            bench.commander.call(["--sizes=5", "--shapes=wide", f"--json-file={json_file}"])
+            with open(json_file) as f:
+                self.assertEqual(json.load(f)['results'][0]['size'], 5)
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pyclicommander import Commander
+from pyclicommander.exceptions import CommandConflict
+
+
+class Test_bulk_registration(unittest.TestCase):
+    def test_add_clis(self):
+        commander = Commander()
+
+        def queue_list(q=False):
+            """ List queue. """
+            return "list", q
+
+        commander.add_clis([
+            ("queue list [-q]", queue_list),
+            ("queue purge", lambda: "purge", "Purge queue."),
+            ("queue KEY accept", lambda key: key),
+        ])
+
+        self.assertEqual(commander.call(["queue", "list", "-q"]), ("list", True))
+        self.assertEqual(commander.call(["queue", "purge"]), "purge")
+        self.assertEqual(commander.call(["queue", "apa", "accept"]), "apa")
+        self.assertEqual(commander.cmd.subcommands["queue"].subcommands["purge"]['short_description'], "Purge queue.")
+        self.assertEqual(list(commander.cmd.subcommands), ["queue"])
+
+    def test_add_clis_table(self):
+        commander = Commander()
+        commander.add_clis({
+            "status [NAME] [--verbose/-v]": "tests.lazy_handlers:status",
+            "other": {"func": "tests.lazy_handlers:status", "short_description": "Other status."},
+        })
+        self.assertEqual(commander.call(["status", "apa", "-v"]), ("status", "apa", True))
+        self.assertEqual(commander.cmd.subcommands["other"]['short_description'], "Other status.")
+
+    def test_add_clis_from_json(self):
+        commander = Commander()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            table_file = os.path.join(tmp_dir, "commands.json")
+            with open(table_file, "w") as f:
+                json.dump({"status [NAME]": "tests.lazy_handlers:status"}, f)
+            commander.add_clis_from_file(table_file)
+        self.assertEqual(commander.call(["status", "apa"]), ("status", "apa", False))
+
+    @unittest.skipIf(sys.version_info < (3, 11), "tomllib requires python 3.11")
+    def test_add_clis_from_toml(self):
+        commander = Commander()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            table_file = os.path.join(tmp_dir, "commands.toml")
+            with open(table_file, "w") as f:
+                f.write('"status [NAME]" = "tests.lazy_handlers:status"\n')
+            commander.add_clis_from_file(table_file)
+        self.assertEqual(commander.call(["status", "apa"]), ("status", "apa", False))
+
+    def test_conflicts(self):
+        commander = Commander()
+        commander.add_cli("queue KEY", lambda key: key)
+
+        with self.assertRaises(CommandConflict):
+            commander.add_clis([("queue list", lambda: None), ("queue list", lambda: None)])
+
+        with self.assertRaises(CommandConflict):
+            commander.add_clis([("queue KEY", lambda key: key)])
+
+        with self.assertRaises(CommandConflict):
+            commander.add_clis([("queue NAME info", lambda name: name)])
+
+        # Same wildcard is fine
+        commander.add_clis([("queue KEY info", lambda key: key + " info")])
+        self.assertEqual(commander.call(["queue", "apa", "info"]), "apa info")
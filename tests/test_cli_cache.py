@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import unittest
+from pyclicommander import Commander
+from pyclicommander.exceptions import CommanderError
+
+
+def module_level_handler(word, upper=False):
+    """ Module level command. """
+    return word.upper() if upper else word
+
+
+class Test_cache_file(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, "commands.cache")
+        self.source_path = os.path.join(self.tmp_dir.name, "source.py")
+        with open(self.source_path, "w") as f:
+            f.write("# source")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self):
+        commander = Commander()
+        commander.add_cli("speak WORD [--upper/-u]", module_level_handler)
+        commander.add_cli("status [NAME]", "tests.lazy_handlers:status", "Show status.")
+        commander.save_cache(self.cache_path, sources=[self.source_path])
+
+        sys.modules.pop("tests.lazy_handlers", None)
+        loaded = Commander()
+        self.assertTrue(loaded.load_cache(self.cache_path, sources=[self.source_path]))
+        self.assertNotIn("tests.lazy_handlers", sys.modules)
+
+        self.assertEqual(loaded.call(["speak", "apa", "--upper"]), "APA")
+        self.assertEqual(loaded.call(["status", "bepa"]), ("status", "bepa", False))
+        self.assertEqual(loaded.cmd.subcommands["speak"].subcommands["WORD"]['short_description'],
+                         "Module level command.")
+
+    def test_invalid_cache(self):
+        commander = Commander()
+        commander.add_cli("speak WORD", module_level_handler)
+        self.assertFalse(commander.load_cache(self.cache_path, sources=[self.source_path]))
+
+        commander.save_cache(self.cache_path, sources=[self.source_path])
+        with open(self.source_path, "w") as f:
+            f.write("# modified source")
+        self.assertFalse(Commander().load_cache(self.cache_path, sources=[self.source_path]))
+
+    def test_local_function_not_cacheable(self):
+        commander = Commander()
+
+        @commander.cli("local")
+        def local_handler():
+            pass
+
+        with self.assertRaises(CommanderError):
+            commander.save_cache(self.cache_path)
@@ -0,0 +1,56 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander import completion
+
+
+class Test_completion(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander("app")
+        self.commander.add_cli("queue list [-q/--quiet] [--user=NAME]", lambda q=False, user=None: None)
+        self.commander.add_cli("queue purge", lambda: None)
+        self.commander.add_cli("queue KEY accept", lambda key: None)
+        self.commander.add_cli("queue KEY archive", lambda key: None)
+        self.commander.add_cli("status", lambda: None)
+        self.nodes = completion.build_index(self.commander.cmd)
+
+    def test_complete(self):
+        self.assertEqual(completion.complete(self.nodes, [""]), ("queue", "status"))
+        self.assertEqual(completion.complete(self.nodes, ["q"]), ("queue",))
+        self.assertEqual(completion.complete(self.nodes, ["queue", "p"]), ("purge",))
+        self.assertEqual(completion.complete(self.nodes, ["queue", "list", "-"]), ("--quiet", "--user=", "-q"))
+        self.assertEqual(completion.complete(self.nodes, ["queue", "list", "--q"]), ("--quiet",))
+        self.assertEqual(completion.complete(self.nodes, ["queue", "apa", "a"]), ("accept", "archive"))
+        self.assertEqual(completion.complete(self.nodes, ["queue", "list", "-q", ""]), ())
+        self.assertEqual(completion.complete(self.nodes, []), ("queue", "status"))
+        self.assertEqual(completion.complete(self.nodes, ["bogus", "s"]), ())
+        self.assertEqual(completion.complete(self.nodes, ["bogus", "-"]), ())
+
+    def test_index_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_path = os.path.join(tmp_dir, "app.complete")
+            self.commander.save_completion_index(index_path)
+
+            with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+                completion.main([index_path, "--", "queue", ""])
+            self.assertEqual(mock_stdout.getvalue(), "list\npurge\n")
+
+            # Completing must not import the Commander.
+            code = "import sys, pyclicommander.completion as c; c.main(sys.argv[1:]); " \
+                   "print('pyclicommander.commander' in sys.modules)"
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+            output = subprocess.run([sys.executable, "-c", code, index_path, "--", "st"],
+                                    capture_output=True, text=True, env=env, check=True).stdout
+            self.assertEqual(output, "status\nFalse\n")
+
+    def test_scripts(self):
+        for shell in ("bash", "zsh", "fish"):
+            script = completion.script(shell, "my-app", "/tmp/app.complete", python="python3")
+            self.assertIn("python3 -m pyclicommander.completion", script)
+            self.assertIn("my-app", script)
+        self.assertIn("complete -o default -F _my_app_complete my-app", completion.script("bash", "my-app", "x"))
@@ -0,0 +1,62 @@
+import threading
+import unittest
+from pyclicommander import Commander
+from pyclicommander.exceptions import UnknownCommand
+
+
+class Test_concurrent_registration(unittest.TestCase):
+    def test_snapshots(self):
+        commander = Commander()
+        commander.add_cli("group0 base", lambda: "base")
+        published = commander.cmd
+        commander.call(["group0", "base"])
+
+        # A reader's snapshot is never changed, registering publishes a new tree.
+        commander.add_cli("group0 other KEY", lambda key: key)
+        self.assertIsNot(commander.cmd, published)
+        self.assertEqual(list(published.subcommands["group0"].subcommands), ["base"])
+        self.assertEqual(commander.call(["group0", "other", "k"]), "k")
+
+    def test_stress(self):
+        commander = Commander()
+        commander.add_cli("ping", lambda: "pong")
+        errors = []
+        registered = threading.Event()
+
+        def register(writer):
+            try:
+                for i in range(200):
+                    commander.add_cli(f"group{i % 7} cmd{writer}_{i} [VALUE]", lambda value=None, i=i: (i, value))
+                    if i % 50 == 0:
+                        commander.add_clis([(f"bulk{writer}_{i} KEY", lambda key: key)])
+            except Exception as e:
+                errors.append(e)
+
+        def call(reader):
+            i = 0
+            try:
+                while not registered.is_set() or i < 200:
+                    self.assertEqual(commander.call(["ping"]), "pong")
+                    name = f"cmd{reader % 2}_{i % 200}"
+                    try:
+                        self.assertEqual(commander.call([f"group{i % 200 % 7}", name, "v"]), (i % 200, "v"))
+                    except UnknownCommand:
+                        pass
+                    i += 1
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=register, args=(w,)) for w in range(2)]
+        readers = [threading.Thread(target=call, args=(r,)) for r in range(4)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        registered.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        paths = [path for path, _cmd in commander.get_cmds()]
+        self.assertEqual(len(paths), 1 + 2 * 200 + 2 * 4)
+        self.assertEqual(commander.call(["group3", "cmd1_199"]), (199, None))
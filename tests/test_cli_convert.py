@@ -0,0 +1,95 @@
+import enum
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from typing import Optional
+from pyclicommander import Commander
+from pyclicommander.exceptions import CommanderError, InvalidArgumentValue
+
+
+class Color(enum.Enum):
+    RED = "r"
+    GREEN = "g"
+
+
+class Test_typed_arguments(unittest.TestCase):
+    def test_annotations(self):
+        commander = Commander()
+
+        @commander.cli("move NUMBER PATH [--color=C] [--ratio=R] [--force=F] [-q]")
+        def move(number: int, path: Path, color: Color = Color.RED, ratio: Optional[float] = None,
+                 force: bool = False, q: bool = False):
+            return number, path, color, ratio, force, q
+
+        self.assertEqual(commander.call(["move", "3", "/tmp"]), (3, Path("/tmp"), Color.RED, None, False, False))
+        self.assertEqual(commander.call(["move", "3", "/tmp", "--color=GREEN", "--ratio=0.5", "--force=yes", "-q"]),
+                         (3, Path("/tmp"), Color.GREEN, 0.5, True, True))
+        self.assertEqual(commander.call(["move", "3", "/tmp", "--color=g"])[2], Color.GREEN)
+
+        with self.assertRaises(InvalidArgumentValue) as cm:
+            commander.call(["move", "three", "/tmp"])
+        self.assertEqual(cm.exception.param, "number")
+        self.assertIsInstance(cm.exception, CommanderError)
+
+        with self.assertRaises(InvalidArgumentValue) as cm:
+            commander.call(["move", "3", "/tmp", "--color=blue"])
+        self.assertEqual(cm.exception.param, "color")
+
+    @unittest.skipIf(sys.version_info < (3, 10), "X | None needs python 3.10")
+    def test_union_operator(self):
+        # Defined from source so the file still parses on older pythons.
+        namespace = {}
+        exec("def num(n: int | None = None):\n    return n", namespace)
+        commander = Commander()
+        commander.add_cli("num [N]", namespace['num'])
+        self.assertEqual(commander.call(["num", "3"]), 3)
+        self.assertIsNone(commander.call(["num"]))
+
+    def test_variadic(self):
+        commander = Commander()
+
+        @commander.cli("sum [KEY...]")
+        def sum_keys(*keys: int):
+            return sum(keys)
+
+        self.assertEqual(commander.call(["sum"]), 0)
+        self.assertEqual(commander.call(["sum", "1", "2", "3"]), 6)
+
+        with self.assertRaises(InvalidArgumentValue) as cm:
+            commander.call(["sum", "1", "x", "3"])
+        self.assertEqual(cm.exception.param, "keys")
+        self.assertIn("'x'", str(cm.exception))
+
+    def test_no_annotations(self):
+        commander = Commander()
+
+        @commander.cli("echo WORD [--times=N]")
+        def echo(word, times=None):
+            return word, times
+
+        self.assertEqual(commander.call(["echo", "1", "--times=2"]), ("1", "2"))
+        self.assertFalse(commander.cmd.subcommands["echo"].subcommands["WORD"]['converter'])
+
+    def test_containers(self):
+        commander = Commander()
+
+        @commander.cli("tag NAME [--labels=L]")
+        def tag(name: list, labels: tuple = ()):
+            return name, labels
+
+        # A container annotation doesn't split the string into characters.
+        self.assertEqual(commander.call(["tag", "abc", "--labels=x,y"]), ("abc", "x,y"))
+
+    @patch('builtins.print')
+    def test_call_with_help(self, mock_print):
+        commander = Commander()
+
+        @commander.cli("num N")
+        def num(n: int):
+            """ Number. """
+            return n
+
+        self.assertIsNone(commander.call_with_help(["num", "x"]))
+        self.assertEqual(str(mock_print.mock_calls[0].args[0]), "n: invalid value 'x'")
+        self.assertGreater(len(mock_print.mock_calls), 1)
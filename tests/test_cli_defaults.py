@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from pyclicommander import Commander
+from pyclicommander.exceptions import InvalidArgumentValue
+
+
+class Test_defaults(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+
+        @self.commander.cli("queue list [--user=U] [--timeout=T] [--quiet/-q]")
+        def list_(user=None, timeout: int = 1, quiet=False):
+            return user, timeout, quiet
+
+        @self.commander.cli("queue accept KEY [--timeout=T]")
+        def accept(key, timeout: int = 1):
+            return key, timeout
+
+        @self.commander.cli("status")
+        def status():
+            return "ok"
+
+    def test_layers(self):
+        config = {"timeout": 5, "queue": {"list": {"user": "bob", "q": True}, "accept": {"timeout": "7"}}}
+        environ = {"APP_QUEUE_LIST_USER": "alice", "APP_QUEUE_LIST_QUIET": "no"}
+        defaults = self.commander.set_defaults(config, env_prefix="APP")
+        defaults.environ = environ
+
+        self.assertEqual(self.commander.call(["queue", "list"]), ("alice", 5, False))
+        self.assertEqual(self.commander.call(["queue", "list", "--user=carol", "--timeout=2", "-q"]),
+                         ("carol", 2, True))
+        self.assertEqual(self.commander.call(["queue", "accept", "k"]), ("k", 7))
+        self.assertEqual(self.commander.call(["status"]), "ok")
+
+        # Resolved once per path, until reset.
+        environ["APP_QUEUE_LIST_USER"] = "dave"
+        self.assertEqual(self.commander.call(["queue", "list"])[0], "alice")
+        defaults.reset()
+        self.assertEqual(self.commander.call(["queue", "list"])[0], "dave")
+
+    def test_invalid_env_bool(self):
+        defaults = self.commander.set_defaults(env_prefix="APP")
+        defaults.environ = {"APP_QUEUE_LIST_QUIET": "maybe"}
+
+        with self.assertRaises(InvalidArgumentValue) as cm:
+            self.commander.call(["queue", "list"])
+        self.assertEqual(cm.exception.param, "quiet")
+        self.assertIn("APP_QUEUE_LIST_QUIET", str(cm.exception))
+        self.assertIsInstance(next(self.commander.call_many(["queue list"])).error, InvalidArgumentValue)
+
+    def test_config_file(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"queue": {"timeout": 3}}, f)
+        self.addCleanup(os.unlink, path)
+
+        self.commander.set_defaults(path)
+        self.assertEqual(self.commander.call(["queue", "list"]), (None, 3, False))
+        self.assertEqual(self.commander.call(["queue", "accept", "k"]), ("k", 3))
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.exceptions import UnknownCommand, UnknownFlag
+from pyclicommander.instrumentation import Hook, StatsCollector
+
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.events = []
+
+    def before(self, phase, path):
+        self.events.append(('before', phase, path))
+
+    def after(self, phase, path, error=None):
+        self.events.append(('after', phase, path, type(error).__name__ if error else None))
+
+
+class Test_instrumentation(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+
+        @self.commander.cli("queue list [-q]")
+        def queue_list(q=False):
+            return "list"
+
+    def test_hook_phases(self):
+        hook = self.commander.add_hook(RecordingHook())
+        self.assertEqual(self.commander.call(["queue", "list"]), "list")
+
+        self.assertEqual(hook.events, [
+            ('before', 'resolve', None),
+            ('after', 'resolve', None, None),
+            ('before', 'parse', 'queue list'),
+            ('after', 'parse', 'queue list', None),
+            ('before', 'invoke', 'queue list'),
+            ('after', 'invoke', 'queue list', None),
+        ])
+
+        hook.events.clear()
+        with self.assertRaises(UnknownFlag):
+            self.commander.call(["queue", "list", "-x"])
+        self.assertEqual(hook.events[-1], ('after', 'parse', 'queue list', 'UnknownFlag'))
+
+    @patch('builtins.print')
+    def test_stats_collector(self, _mock_print):
+        stats = self.commander.add_hook(StatsCollector())
+        self.commander.call(["queue", "list"])
+        self.commander.call(["queue", "list", "-q"])
+        self.commander.help(["queue", "list"])
+        with self.assertRaises(UnknownCommand):
+            self.commander.call(["queue"])
+
+        result = json.loads(stats.to_json())
+        self.assertEqual(result['calls'], {'queue list': 2})
+        self.assertEqual(result['errors'], {'UnknownCommand': 1})
+        self.assertEqual({phase: s['count'] for phase, s in result['phases'].items()},
+                         {'resolve': 3, 'parse': 2, 'invoke': 2, 'help': 1})
+
+        prometheus = stats.to_prometheus()
+        self.assertIn('pyclicommander_command_calls_total{path="queue list"} 2\n', prometheus)
+        self.assertIn('pyclicommander_errors_total{type="UnknownCommand"} 1\n', prometheus)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prom_file = os.path.join(tmp_dir, "commander.prom")
+            stats.write_prometheus(prom_file)
+            with open(prom_file) as f:
+                self.assertEqual(f.read(), prometheus)
+
+    def test_other_dispatch_paths(self):
+        @self.commander.cli("slow")
+        async def slow():
+            await asyncio.sleep(0.01)
+            return "slow"
+
+        @self.commander.cli("upper")
+        def upper(text):
+            return text.upper()
+
+        stats = self.commander.add_hook(StatsCollector())
+
+        async def call_async():
+            self.assertEqual(await self.commander.call_async(["queue", "list"]), "list")
+            return [r.result async for r in self.commander.call_many_async(["slow", "slow", "queue list"])]
+
+        self.assertEqual(asyncio.run(call_async()), ["slow", "slow", "list"])
+        self.assertEqual([r.result for r in self.commander.call_many(["queue list"] * 3, threads=2)], ["list"] * 3)
+        self.assertEqual(self.commander.pipeline("queue list | upper"), "LIST")
+
+        result = stats.to_dict()
+        self.assertEqual(result['calls'], {'queue list': 5, 'slow': 2, 'queue list | upper': 1})
+        self.assertEqual({phase: s['count'] for phase, s in result['phases'].items()},
+                         {'resolve': 9, 'parse': 9, 'invoke': 8})
+        # Concurrent tasks each time their own invoke.
+        self.assertGreaterEqual(result['phases']['invoke']['max_ns'], 10 ** 7)
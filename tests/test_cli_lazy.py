@@ -0,0 +1,31 @@
+import sys
+import unittest
+from unittest.mock import patch, call
+from pyclicommander import Commander
+
+
+class Test_lazy_registration(unittest.TestCase):
+    def setUp(self):
+        sys.modules.pop("tests.lazy_handlers", None)
+
+    def test_import_on_call(self):
+        commander = Commander()
+        commander.add_cli("status [NAME] [--verbose/-v]", "tests.lazy_handlers:status", "Show status.")
+
+        self.assertNotIn("tests.lazy_handlers", sys.modules)
+        self.assertEqual(commander.call(["status", "apa", "-v"]), ("status", "apa", True))
+        self.assertIn("tests.lazy_handlers", sys.modules)
+
+    @patch('builtins.print')
+    def test_help_without_import(self, mock_print):
+        commander = Commander()
+        commander.add_cli("status [NAME]", "tests.lazy_handlers:status", "Show status.")
+
+        commander.call(["status", "--help"])
+        commander.help_all_commands()
+
+        self.assertNotIn("tests.lazy_handlers", sys.modules)
+        self.assertEqual(mock_print.mock_calls, [
+            call('Usage: status [NAME]\nShow status.'),
+            call('status [NAME]\n\tShow status.'),
+        ])
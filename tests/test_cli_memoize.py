@@ -0,0 +1,119 @@
+import asyncio
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from typing import Iterable
+from pyclicommander import Commander
+from pyclicommander.exceptions import CommanderError
+from pyclicommander.memoize import ResultCache
+
+
+class Test_memoize(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def register(self, commander, cache):
+        @commander.cli("describe KEY [--verbose/-v]", cache=cache)
+        def describe(key, verbose=False):
+            self.calls.append(key)
+            return f"{key} {verbose} {len(self.calls)}"
+
+    def test_memoized(self):
+        commander = Commander()
+        self.register(commander, cache=True)
+
+        self.assertEqual(commander.call(["describe", "apa", "-v"]), "apa True 1")
+        self.assertEqual(commander.call(["describe", "apa", "--verbose"]), "apa True 1")
+        self.assertEqual(commander.call(["describe", "apa"]), "apa False 2")
+        self.assertEqual(commander.call(["describe", "bepa"]), "bepa False 3")
+
+        cache = commander.cmd.subcommands["describe"].subcommands["KEY"]['cache']
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3, 'size': 3})
+
+        commander.invalidate_cache(["describe", "apa", "-v"])
+        self.assertEqual(commander.call(["describe", "apa", "-v"]), "apa True 4")
+        self.assertEqual(commander.call(["describe", "bepa"]), "bepa False 3")
+
+        commander.clear_caches()
+        self.assertEqual(commander.call(["describe", "bepa"]), "bepa False 5")
+
+    def test_lru_and_ttl(self):
+        commander = Commander()
+        self.register(commander, cache=ResultCache(maxsize=2, ttl=0.05))
+
+        commander.call(["describe", "a"])
+        commander.call(["describe", "b"])
+        commander.call(["describe", "a"])
+        commander.call(["describe", "c"])  # evicts b, least recently used
+        commander.call(["describe", "a"])
+        commander.call(["describe", "b"])
+        self.assertEqual(self.calls, ["a", "b", "c", "b"])
+
+        time.sleep(0.06)
+        commander.call(["describe", "b"])
+        self.assertEqual(self.calls, ["a", "b", "c", "b", "b"])
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "results.sqlite")
+
+            commander = Commander()
+            self.register(commander, cache=ResultCache(path=db_path))
+            self.assertEqual(commander.call(["describe", "apa"]), "apa False 1")
+
+            # New process, same database.
+            other = Commander()
+            self.register(other, cache=pickle.loads(pickle.dumps(ResultCache(path=db_path))))
+            self.assertEqual(other.call(["describe", "apa"]), "apa False 1")
+            self.assertEqual(other.call(["describe", "bepa"]), "bepa False 2")
+            self.assertEqual(self.calls, ["apa", "bepa"])
+
+            other.invalidate_cache(["describe", "apa"])
+            self.assertEqual(commander.call(["describe", "apa"]), "apa False 1")
+            self.assertEqual(other.call(["describe", "apa"]), "apa False 3")
+
+    def test_memoized_call_async_and_pipeline(self):
+        commander = Commander()
+        self.register(commander, cache=True)
+
+        @commander.cli("upper")
+        def upper(text):
+            return text.upper()
+
+        async def call_async():
+            results = [await commander.call_async(["describe", "apa"]) for _ in range(2)]
+            async for batch_result in commander.call_many_async(["describe apa", "describe bepa"]):
+                results.append(batch_result.result)
+            return results
+
+        self.assertEqual(asyncio.run(call_async()), ["apa False 1", "apa False 1", "apa False 1", "bepa False 2"])
+        self.assertEqual(commander.pipeline("describe apa | upper"), "APA FALSE 1")
+        self.assertEqual(commander.call(["describe", "bepa"]), "bepa False 2")
+        self.assertEqual(self.calls, ["apa", "bepa"])
+
+    def test_lazy_arguments_not_supported(self):
+        commander = Commander()
+
+        @commander.cli("total [KEY...]", cache=True)
+        def total(keys: Iterable[int]):
+            return sum(keys)
+
+        for _ in range(2):
+            with self.assertRaises(CommanderError):
+                commander.call(["total", "1", "2"])
+        self.assertEqual(commander.cmd.get_path(["total"])['cache'].stats()['size'], 0)
+
+    def test_async_not_supported(self):
+        commander = Commander()
+        with self.assertRaises(CommanderError):
+            @commander.cli("fetch", cache=True)
+            async def fetch():
+                pass
+
+        # Registered by import path, found out when it's imported.
+        commander.add_cli("fetch KEY", "tests.lazy_handlers:fetch", cache=True)
+        for _ in range(2):
+            with self.assertRaises(CommanderError):
+                asyncio.run(commander.call_async(["fetch", "k"]))
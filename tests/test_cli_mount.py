@@ -0,0 +1,59 @@
+import sys
+import unittest
+from unittest.mock import patch, call
+from pyclicommander import Commander
+from pyclicommander.exceptions import CommanderError, UnknownCommand
+
+_MODULES = ("tests.mounted_commands", "tests.nested_mounted_commands")
+
+
+class Test_mount(unittest.TestCase):
+    def setUp(self):
+        for module in _MODULES:
+            sys.modules.pop(module, None)
+        self.commander = Commander()
+        self.commander.mount("queue", "tests.mounted_commands:commander", "Queue commands.")
+
+        @self.commander.cli("status")
+        def status():
+            """ Show status. """
+            return "status"
+
+    def test_import_on_walk(self):
+        self.assertEqual(self.commander.call(["status"]), "status")
+        with self.assertRaises(UnknownCommand):
+            self.commander.call(["other"])
+        self.assertNotIn("tests.mounted_commands", sys.modules)
+
+        self.assertEqual(self.commander.call(["queue", "list", "--user=bob"]), ("list", "bob"))
+        self.assertIn("tests.mounted_commands", sys.modules)
+        self.assertNotIn("tests.nested_mounted_commands", sys.modules)
+        self.assertEqual(self.commander.call(["queue", "accept", "k"]), ("accept", "k"))
+        self.assertEqual(self.commander.call(["queue", "jobs", "run", "x"]), ("run", "x"))
+        self.assertEqual(self.commander.call_resolved(("queue", "accept", "KEY"), ["k"], {}), ("accept", "k"))
+
+    def test_call_resolved(self):
+        self.assertEqual(self.commander.call_resolved(("queue", "jobs", "run", "NAME"), ["x"], {}), ("run", "x"))
+
+    @patch('builtins.print')
+    def test_help(self, mock_print):
+        self.commander.help(["queue", "list"])
+        self.assertEqual(mock_print.mock_calls, [call('Usage: queue list [--user=U]\nList queue.')])
+
+        mock_print.reset_mock()
+        self.commander.help_all_commands()
+        self.assertEqual(mock_print.mock_calls, [
+            call('queue list [--user=U]\n'
+                 '\tList queue.\n'
+                 'queue accept KEY\n'
+                 '\tAccept key.\n'
+                 'queue jobs run NAME\n'
+                 '\tRun job.\n'
+                 'status\n'
+                 '\tShow status.'),
+        ])
+
+    def test_not_a_commander(self):
+        self.commander.mount("bad", "tests.mounted_commands:list_")
+        with self.assertRaises(CommanderError):
+            self.commander.call(["bad", "x"])
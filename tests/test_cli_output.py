@@ -0,0 +1,58 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.exceptions import CommanderError, InvalidArgumentValue
+from pyclicommander.output import write_records
+
+
+class _BrokenPipe(io.StringIO):
+    def write(self, s):
+        raise BrokenPipeError
+
+
+class Test_streamed_output(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+        self.pulled = []
+
+        @self.commander.cli("list [N]", stream=True)
+        def list_(n="3"):
+            for i in range(int(n)):
+                self.pulled.append(i)
+                yield {"id": i, "name": f"item {i}"}
+
+        @self.commander.cli("names", stream=True)
+        def names():
+            return ["a", ("b", 2)]
+
+    def call(self, args):
+        with patch('sys.stdout', io.StringIO()) as stdout:
+            self.assertIsNone(self.commander.call(args))
+        return stdout.getvalue()
+
+    def test_formats(self):
+        self.assertEqual(self.call(["names"]), "a\nb\t2\n")
+        self.assertEqual([json.loads(line) for line in self.call(["list", "--output=jsonl"]).splitlines()],
+                         [{"id": i, "name": f"item {i}"} for i in range(3)])
+        self.assertEqual(self.call(["list", "2", "--output=csv"]), "id,name\n0,item 0\n1,item 1\n")
+        self.assertEqual(self.call(["names", "--output=csv"]), "a\nb,2\n")
+
+        with self.assertRaises(InvalidArgumentValue):
+            self.call(["list", "--output=xml"])
+        self.assertEqual(self.pulled, [0, 1, 2, 0, 1])
+
+    def test_broken_pipe(self):
+        with patch('sys.stdout', _BrokenPipe()):
+            self.commander.call(["list", "100000"])
+        # Stopped pulling at the first chunk.
+        self.assertLess(len(self.pulled), 10000)
+
+        records = (i for i in range(10))
+        self.assertFalse(write_records(records, stream=_BrokenPipe(), buffer_size=1))
+        self.assertEqual(list(records), [])
+
+    def test_no_cache(self):
+        with self.assertRaises(CommanderError):
+            self.commander.add_cli("cached", lambda: [], cache=True, stream=True)
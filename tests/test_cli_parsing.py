@@ -192,10 +192,10 @@ class Test_parse_definitions(unittest.TestCase):
         commander.call(["mockcmd", "--help"])
 
         self.assertEqual(mock_print.mock_calls, [
-            call('Usage: mockcmd'),
-            call(),
-            call('Subcommands:'),
-            call('\tbepa\t'),
+            call('Usage: mockcmd\n'
+                 '\n'
+                 'Subcommands:\n'
+                 '\tbepa\t'),
         ])
 
     @patch('builtins.print')
@@ -220,11 +220,11 @@ class Test_parse_definitions(unittest.TestCase):
         commander.call(["mockcmd", "--help"])
 
         self.assertEqual(mock_print.mock_calls, [
-            call('Usage: mockcmd'),
-            call(),
-            call('Subcommands:'),
-            call('\textra\tNormal command.'),
-            call('\tBEPA\tWildcard command.'),
+            call('Usage: mockcmd\n'
+                 '\n'
+                 'Subcommands:\n'
+                 '\textra\tNormal command.\n'
+                 '\tBEPA\tWildcard command.'),
         ])
 
     @patch('builtins.print')
@@ -256,12 +256,85 @@ class Test_parse_definitions(unittest.TestCase):
         commander.call([""])
 
         self.assertEqual(mock_print.mock_calls, [
-            call(''),
-            call('\tTest command.'),
-            call('apa'),
-            call('\tApa command.'),
-            call('apa bepa'),
-            call('\tsub-bepa command.'),
-            call('apa bepa cepa'),
-            call('\tsub-sub-cepa command.'),
+            call('\n'
+                 '\tTest command.\n'
+                 'apa\n'
+                 '\tApa command.\n'
+                 'apa bepa\n'
+                 '\tsub-bepa command.\n'
+                 'apa bepa cepa\n'
+                 '\tsub-sub-cepa command.'),
         ])
+
+    @patch('builtins.print')
+    def test_help_all_commands_path(self, mock_print):
+        commander = Commander()
+
+        @commander.cli("apa bepa")
+        def subcommand_bepa():
+            """Bepa command."""
+
+        @commander.cli("apa cepa KEY")
+        def subcommand_cepa(key):
+            pass
+
+        @commander.cli("depa")
+        def subcommand_depa():
+            pass
+
+        commander.help_all_commands("apa")
+        commander.help_all_commands(["apa", "cepa"])
+        commander.help_all_commands("nothing")
+
+        self.assertEqual(mock_print.mock_calls, [
+            call('apa bepa\n'
+                 '\tBepa command.\n'
+                 'apa cepa KEY'),
+            call('apa cepa KEY'),
+        ])
+
+    @patch('builtins.print')
+    def test_help_cached(self, mock_print):
+        commander = Commander()
+
+        @commander.cli("apa")
+        def subcommand_apa():
+            """Apa command."""
+
+        info = commander.cmd.subcommands["apa"].info
+        # __doc__ is only parsed when asked for.
+        self.assertIsNone(info.short_description)
+
+        commander.help(["apa"])
+        self.assertEqual(info.short_description, "Apa command.")
+        self.assertIsNotNone(info.help)
+        # No long description in a one line docstring.
+        self.assertIsNone(commander.cmd.subcommands["apa"]['long_description'])
+
+        @commander.cli("apa bepa")
+        def subcommand_bepa():
+            """Bepa command."""
+
+        commander.help(["apa"])
+        self.assertEqual(mock_print.mock_calls[0], call('Usage: apa\nApa command.'))
+        self.assertEqual(mock_print.mock_calls[1], call('Usage: apa\nApa command.\n'
+                                                        '\n'
+                                                        'Subcommands:\n'
+                                                        '\tbepa\tBepa command.'))
+
+    def test_compiled_parser(self):
+        commander = Commander()
+
+        @commander.cli("mockcmd KEY [OTHER] [-q/--quiet] [--user-data=D]")
+        def subcommand_a(key, other=None, q=False, user_data=None):
+            return key, other, q, user_data
+
+        parser = commander.cmd.subcommands["mockcmd"].subcommands["KEY"]['parser']
+        self.assertEqual((parser.min_args, parser.max_args), (1, 2))
+        self.assertEqual(parser.lookup_flag("quiet"), ("q", False))
+        self.assertEqual(parser.lookup_flag("user-data"), ("user_data", True))
+        self.assertEqual(parser.lookup_flag("user_data"), ("user_data", True))
+
+        self.assertEqual(commander.call(["mockcmd", "a", "b", "--quiet", "--user_data=x"]), ("a", "b", True, "x"))
+        with self.assertRaises(UnknownArgument):
+            commander.call(["mockcmd", "a", "b", "c"])
@@ -90,3 +90,54 @@ class Test_commander_paths(unittest.TestCase):
 
         self.assertEqual(commander.call(["mockcmd_a"]), "CALLED a")
         self.assertEqual(commander.call(["mockcmd_b"]), "CALLED b")
+
+    def test_compiled_exact_before_wildcard(self):
+        commander = Commander()
+
+        @commander.cli("mockcmd NAME")
+        def subcommand_wildcard(name):
+            return "wildcard " + name
+
+        @commander.cli("mockcmd apa")
+        def subcommand_apa():
+            return "APA"
+
+        compiled = commander.compile()
+        self.assertEqual(len(compiled.nodes), 4)
+        self.assertEqual(commander.call(["mockcmd", "apa"]), "APA")
+        self.assertEqual(commander.call(["mockcmd", "bepa"]), "wildcard bepa")
+
+        # Tree changed, recompiled on next call.
+        @commander.cli("mockcmd bepa")
+        def subcommand_bepa():
+            return "BEPA"
+
+        self.assertEqual(commander.call(["mockcmd", "bepa"]), "BEPA")
+        self.assertIsNot(commander._compiled, compiled)
+
+    def test_compact_nodes(self):
+        commander = Commander()
+        commander.add_cli("queue list [-q]", lambda q=False: q)
+        commander.add_cli("queue show [-q]", lambda q=False: q)
+        commander.add_cli("queue purge", lambda: "purge")
+
+        queue = commander.cmd.subcommands["queue"]
+        queue_list, queue_show, queue_purge = queue.subcommands.values()
+        self.assertFalse(hasattr(queue_list, "__dict__"))
+        self.assertFalse(hasattr(queue_list.info, "__dict__"))
+
+        # Leaves and inactive nodes share empty containers, same flags share parser.
+        self.assertIs(queue_list.subcommands, queue_purge.subcommands)
+        self.assertIs(queue.info, commander.cmd.info)
+        self.assertIs(queue_list['parser'], queue_show['parser'])
+        self.assertIsNot(queue_list['parser'], queue_purge['parser'])
+        with self.assertRaises(TypeError):
+            queue_purge.subcommands["apa"] = None
+
+        # Item access still works, also for keys that are not fields.
+        self.assertEqual(queue_list['usage'], "queue list [-q]")
+        self.assertIsNone(queue['usage'])
+        queue['custom'] = "apa"
+        self.assertEqual(queue['custom'], "apa")
+        self.assertIsNone(commander.cmd['custom'])
+        self.assertEqual(commander.call(["queue", "show", "-q"]), True)
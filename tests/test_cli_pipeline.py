@@ -0,0 +1,56 @@
+import io
+import unittest
+from typing import Iterable
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.batch import split_pipeline
+from pyclicommander.exceptions import UnknownCommand
+
+
+class Test_pipeline(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+        self.pulled = []
+
+        @self.commander.cli("list users [COUNT]")
+        def list_users(count: int = 3):
+            for i in range(count):
+                self.pulled.append(i)
+                yield {"id": i}
+
+        @self.commander.cli("enrich [--prefix=P]")
+        def enrich(users: Iterable[dict], prefix="user"):
+            for user in users:
+                yield {**user, "name": f"{prefix}{user['id']}"}
+
+        @self.commander.cli("export", stream=True)
+        def export(users):
+            return (user["name"] for user in users)
+
+        @self.commander.cli("take N")
+        def take(records, n: int):
+            return [record for _i, record in zip(range(n), records)]
+
+    def test_split(self):
+        self.assertEqual(split_pipeline("list users|enrich --prefix='a b' | export"),
+                         [["list", "users"], ["enrich", "--prefix=a b"], ["export"]])
+
+    def test_lazy(self):
+        users = self.commander.pipeline(["list", "users"], "enrich --prefix=u")
+        self.assertEqual(self.pulled, [])
+        self.assertEqual(next(users), {"id": 0, "name": "u0"})
+        self.assertEqual(self.pulled, [0])
+
+        self.assertEqual(self.commander.pipeline("list users 100 | enrich | take 2"),
+                         [{"id": 0, "name": "user0"}, {"id": 1, "name": "user1"}])
+        self.assertEqual(self.pulled, [0, 0, 1])
+
+    def test_stream_last(self):
+        with patch('sys.stdout', io.StringIO()) as stdout:
+            self.assertIsNone(self.commander.pipeline("list users 2 | enrich | export --output=jsonl"))
+        self.assertEqual(stdout.getvalue(), '"user0"\n"user1"\n')
+
+    def test_resolved_first(self):
+        with self.assertRaises(UnknownCommand):
+            self.commander.pipeline("list users | nothing")
+        self.assertEqual(self.pulled, [])
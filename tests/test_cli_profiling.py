@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.profiling import PROFILE_ENV, _TimingFinder
+
+
+class Test_startup_profiling(unittest.TestCase):
+    def setUp(self):
+        for module in ("tests.mounted_commands", "tests.nested_mounted_commands"):
+            sys.modules.pop(module, None)
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.unlink, self.path)
+
+    def test_disabled(self):
+        with patch.dict(os.environ, {PROFILE_ENV: ""}):
+            commander = Commander()
+        self.assertIsNone(commander._profiler)
+        self.assertFalse(any(isinstance(finder, _TimingFinder) for finder in sys.meta_path))
+
+    def test_report(self):
+        with patch.dict(os.environ, {PROFILE_ENV: self.path}):
+            commander = Commander()
+            profiler = commander._profiler
+            commander.add_cli("status", lambda: "ok")
+            commander.mount("queue", "tests.mounted_commands:commander")
+            self.assertEqual(commander.call(["queue", "accept", "k"]), ("accept", "k"))
+            self.assertEqual(commander.call(["queue", "jobs", "run", "x"]), ("run", "x"))
+        profiler.finish()
+        self.assertFalse(any(isinstance(finder, _TimingFinder) for finder in sys.meta_path))
+
+        with open(self.path) as f:
+            report = json.load(f)
+        self.assertGreater(report['time_to_dispatch_ms'], 0)
+        self.assertEqual(report['totals']['commands'], 4)
+        modules = {m['module']: m for m in report['modules']}
+        self.assertGreater(modules['tests.mounted_commands']['cumulative_import_ms'], 0)
+        self.assertEqual(modules['tests.mounted_commands']['commands'], ["list [--user=U]", "accept KEY"])
+        self.assertEqual(modules['tests.nested_mounted_commands']['commands'], ["run NAME"])
+        self.assertEqual(sorted(c['definition'] for c in report['commands']),
+                         ["accept KEY", "list [--user=U]", "run NAME", "status"])
+        totals = [m['import_ms'] + m['registration_ms'] for m in report['modules']]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        module = sys.modules['tests.mounted_commands']
+        self.assertIs(module.__loader__, module.__spec__.loader)
@@ -0,0 +1,93 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.exceptions import InvalidArgumentValue
+
+
+class _Clock:
+    """ Fake monotonic clock, runs of the handler take `cost` seconds. """
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class Test_repeat(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+        self.clock = _Clock()
+        self.runs = []
+
+        @self.commander.cli("queue stats [--cost=C]")
+        def stats(cost: float = 0.0):
+            self.runs.append(self.clock.now)
+            self.clock.now += cost
+            print("size", len(self.runs) // 2)
+            print("consumers 1")
+            return len(self.runs)
+
+    def test_schedule(self):
+        results = list(self.commander.repeat(["queue", "stats", "--cost=0.25"], every=1, count=4,
+                                             clock=self.clock, sleep=self.clock.sleep))
+        self.assertEqual(results, [1, 2, 3, 4])
+        self.assertEqual(self.runs, [100.0, 101.0, 102.0, 103.0])
+
+        # A slow run skips the turns it missed.
+        self.runs.clear()
+        list(self.commander.repeat(["queue", "stats", "--cost=2.5"], every=1, count=3,
+                                   clock=self.clock, sleep=self.clock.sleep))
+        start = self.runs[0]
+        self.assertEqual([run - start for run in self.runs], [0.0, 3.0, 6.0])
+
+    def test_diff(self):
+        with patch('sys.stdout', io.StringIO()) as stdout:
+            list(self.commander.repeat(["queue", "stats"], every=1, count=3, diff=True,
+                                       clock=self.clock, sleep=self.clock.sleep))
+        self.assertEqual(stdout.getvalue(), "size 0\nconsumers 1\n"
+                                            "--- run 1\n+++ run 2\n@@ -1,2 +1,2 @@\n-size 0\n+size 1\n consumers 1\n")
+
+    def test_cli(self):
+        with patch('time.sleep') as sleep, patch('sys.stdout', io.StringIO()):
+            self.assertEqual(self.commander.call(["--every=0.5", "--count", "3", "queue", "stats"]), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+        for every in ("soon", "0", "-1"):
+            with self.assertRaises(InvalidArgumentValue) as cm:
+                self.commander.call([f"--every={every}", "queue", "stats"])
+            self.assertEqual(cm.exception.param, "every")
+        with self.assertRaises(InvalidArgumentValue):
+            self.commander.repeat(["queue", "stats"], every=0)
+
+    def test_response_file(self):
+        @self.commander.cli("accept [KEY...]")
+        def accept(*keys):
+            return keys
+
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write("a\nb\n")
+        self.addCleanup(os.unlink, path)
+
+        results = list(self.commander.repeat(["accept", f"@{path}"], every=1, count=2,
+                                             clock=self.clock, sleep=self.clock.sleep))
+        self.assertEqual(results, [("a", "b"), ("a", "b")])
+        with patch('time.sleep'):
+            self.assertEqual(self.commander.call(["--every=1", "--count=2", "accept", f"@{path}"]), ("a", "b"))
+
+    def test_root_command_flag(self):
+        @self.commander.cli("[--every=N]")
+        def root(every=None):
+            return "root", every
+
+        # The root command's own flag, not repeat mode.
+        self.assertEqual(self.commander.call(["--every=5"]), ("root", "5"))
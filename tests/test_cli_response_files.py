@@ -0,0 +1,88 @@
+import io
+import os
+import tempfile
+import unittest
+from typing import Iterable, Iterator
+from unittest.mock import patch
+from pyclicommander import Commander
+from pyclicommander.exceptions import ArgumentFileError, InvalidArgumentValue, MissingMandatoryArgument
+
+
+class Test_response_files(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write("b\n\nc\r\nd\n")
+        self.addCleanup(os.unlink, self.path)
+
+    def test_expanded(self):
+        commander = Commander()
+
+        @commander.cli("keys [KEY...] [--sep=S]")
+        def keys(*keys, sep=","):
+            return sep.join(keys)
+
+        self.assertEqual(commander.call(["keys", "a", f"@{self.path}", "--sep=-", "e"]), "a-b-c-d-e")
+        with patch('sys.stdin', io.StringIO("x\ny\n")):
+            self.assertEqual(commander.call(["keys", "-", "z"]), "x,y,z")
+        self.assertEqual(commander.call(["keys", "@@literal", "@"]), "@literal,@")
+
+    def test_only_variadic(self):
+        commander = Commander()
+
+        @commander.cli("pair A [B]")
+        def pair(a, b=None):
+            return a, b
+
+        @commander.cli("mail [TO] [CC...]")
+        def mail(to=None, *cc):
+            return to, cc
+
+        # Values of other parameters are never read from a file.
+        self.assertEqual(commander.call(["pair", f"@{self.path}"]), (f"@{self.path}", None))
+        self.assertEqual(commander.call(["pair", "a", "@bob"]), ("a", "@bob"))
+        self.assertEqual(commander.call(["mail", "@bob", f"@{self.path}"]), ("@bob", ("b", "c", "d")))
+
+    def test_missing_file(self):
+        commander = Commander()
+
+        @commander.cli("keys [KEY...]")
+        def keys(*keys):
+            return keys
+
+        missing = os.path.join(os.path.dirname(self.path), "missing-keys.txt")
+        with self.assertRaises(ArgumentFileError) as cm:
+            commander.call(["keys", f"@{missing}"])
+        self.assertEqual(cm.exception.path, missing)
+        self.assertIn(missing, str(cm.exception))
+        self.assertIsInstance(next(commander.call_many([["keys", f"@{missing}"]])).error, ArgumentFileError)
+
+    def test_lazy(self):
+        commander = Commander()
+        received = []
+
+        @commander.cli("total NAME [KEY...]")
+        def total(name, keys: Iterable[int]):
+            received.append(keys)
+            return name, sum(keys)
+
+        @commander.cli("raw [KEY...]")
+        def raw(keys: Iterator):
+            return list(keys)
+
+        with open(self.path, 'w') as f:
+            f.writelines(f"{i}\n" for i in range(1000))
+        self.assertEqual(commander.call(["total", "n", "1", f"@{self.path}"]), ("n", 499501))
+        self.assertNotIsInstance(received[0], (list, tuple))
+        self.assertEqual(commander.call(["total", "n"]), ("n", 0))
+        self.assertEqual(commander.call(["raw", "a", "b"]), ["a", "b"])
+
+        @commander.cli("window [START] [KEY...]")
+        def window(start, keys: Iterable[int]):
+            return start, list(keys)
+
+        self.assertEqual(commander.call(["window", "s", f"@{self.path}", "5"])[1][-2:], [999, 5])
+        with self.assertRaises(MissingMandatoryArgument):
+            commander.call(["window"])
+        with self.assertRaises(InvalidArgumentValue):
+            commander.call(["total", "n", "x"])
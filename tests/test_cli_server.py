@@ -0,0 +1,76 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pyclicommander import Commander
+from pyclicommander import client
+from pyclicommander.server import CommanderServer, current_request
+
+
+class Test_server(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp_dir.name, "commander.sock")
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.commander = Commander()
+
+        @self.commander.cli("speak WORD")
+        def speak(word):
+            print(f"hello {word}")
+            print("oops", file=sys.stderr)
+
+        @self.commander.cli("cat")
+        def cat():
+            print(sys.stdin.read().upper(), end="")
+            return 3
+
+        @self.commander.cli("whereami")
+        def whereami():
+            print(current_request()['cwd'])
+
+        @self.commander.cli("wait")
+        def wait():
+            self.barrier.wait()
+            print("done")
+
+        self.server = CommanderServer(self.commander, self.socket_path, workers=2)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.01})
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+        self.tmp_dir.cleanup()
+
+    def run_client(self, argv, stdin=''):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = client.run(self.socket_path, argv, stdin=stdin, stdout=stdout, stderr=stderr)
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_output_and_exit_code(self):
+        self.assertEqual(self.run_client(["speak", "apa"]), (0, "hello apa\n", "oops\n"))
+        self.assertEqual(self.run_client(["cat"], stdin="bepa\n"), (3, "BEPA\n", ""))
+        self.assertEqual(self.run_client(["whereami"]), (0, os.getcwd() + "\n", ""))
+        self.assertEqual(self.run_client(["unknown"]), (2, "", "UnknownCommand: unknown\n"))
+
+    def test_concurrent_requests(self):
+        # Both requests must be handled at the same time to pass the barrier.
+        results = []
+        other = threading.Thread(target=lambda: results.append(self.run_client(["wait"])))
+        other.start()
+        results.append(self.run_client(["wait"]))
+        other.join()
+        self.assertEqual(results, [(0, "done\n", "")] * 2)
+
+
+class Test_client_fallback(unittest.TestCase):
+    def test_fallback_without_server(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            socket_path = os.path.join(tmp_dir, "missing.sock")
+            self.assertEqual(client.main(socket_path, fallback=lambda argv: len(argv), argv=["a", "b"]), 2)
+
+            with self.assertRaises(FileNotFoundError):
+                client.main(socket_path, argv=["a"])
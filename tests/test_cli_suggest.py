@@ -0,0 +1,121 @@
+import pickle
+import time
+import unittest
+from unittest.mock import patch, call
+from pyclicommander import Commander
+from pyclicommander.exceptions import UnknownCommand, UnknownFlag
+from pyclicommander.suggest import BKTree, NGramIndex, levenshtein, suggest
+
+
+class Test_suggestions(unittest.TestCase):
+    def setUp(self):
+        self.commander = Commander()
+
+        @self.commander.cli("queue list [-q/--quiet] [--user=NAME]")
+        def queue_list(q=False, user=None):
+            return "list"
+
+        @self.commander.cli("queue purge")
+        def queue_purge():
+            return "purge"
+
+        @self.commander.cli("status")
+        def status():
+            return "status"
+
+    def test_bk_tree(self):
+        words = ["queue list", "queue purge", "status", "stats", "start"]
+        tree = BKTree(words)
+        for word in ("queue lst", "stat", "strt", "zzz"):
+            expected = sorted((levenshtein(word, w), w) for w in words if levenshtein(word, w) <= 2)
+            self.assertEqual(tree.search(word, 2), expected)
+        self.assertEqual(suggest(tree, "stauts"), ["stats", "start", "status"])
+        self.assertEqual(suggest(tree, "queue lsit"), ["queue list"])
+
+    def test_ngram_index(self):
+        words = ["list", "purge", "status", "stats", "start", "a", "ab"]
+        index = NGramIndex(words)
+        for word in ("lsit", "stat", "strt", "zzz", "b", "ba"):
+            expected = sorted((levenshtein(word, w, True), w) for w in words if levenshtein(word, w, True) <= 2)
+            self.assertEqual(index.search(word, 2), expected)
+        self.assertEqual(suggest(index, "stauts"), ["stats", "status", "start"])
+
+    def test_unknown_command(self):
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["queue", "lsit"])
+        self.assertEqual(cm.exception.suggestions, ["queue list"])
+
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["stauts"])
+        self.assertEqual(cm.exception.suggestions, ["status"])
+
+        # Commands added later are suggested as well.
+        self.commander.add_cli("stats", lambda: "stats")
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["stauts"])
+        self.assertEqual(cm.exception.suggestions, ["stats", "status"])
+
+    def test_group_word(self):
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["queue"])
+        self.assertEqual(cm.exception.suggestions, ["queue list", "queue purge"])
+
+    def test_wildcard_sibling(self):
+        @self.commander.cli("queue ID show")
+        def queue_show(queue_id):
+            return queue_id
+
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["queue", "lst"])
+        self.assertEqual(cm.exception.suggestions, ["queue list"])
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["queue", "42", "shwo"])
+        self.assertEqual(cm.exception.suggestions, ["queue 42 show"])
+
+    def test_large_tree(self):
+        commander = Commander()
+        for i in range(10000):
+            commander.add_cli(f"l0x{i % 8} l1x{i // 8 % 8} l2x{i // 64 % 8} l3x{i // 512} cmd{i}", lambda: None)
+        for i in range(20000):
+            commander.add_cli(f"cmd{i}", lambda: None)
+        commander.call(["l0x1", "l1x0", "l2x0", "l3x0", "cmd1"])
+
+        start = time.perf_counter()
+        for _ in range(100):
+            with self.assertRaises(UnknownCommand) as cm:
+                commander.call(["cmd123456"])
+        # Not looked up until asked for.
+        self.assertEqual(commander._suggest_indexes, {})
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+        start = time.perf_counter()
+        self.assertEqual(cm.exception.suggestions, ["cmd12345", "cmd12346", "cmd12356"])
+        with self.assertRaises(UnknownCommand) as cm:
+            commander.call(["l0x1"])
+        self.assertEqual(cm.exception.suggestions, ["l0x1 l1x0", "l0x1 l1x1", "l0x1 l1x2"])
+        with self.assertRaises(UnknownCommand) as cm:
+            commander.call(["l0x1", "l1x0", "l2x0", "l3x0", "cdm1"])
+        self.assertEqual(cm.exception.suggestions, ["l0x1 l1x0 l2x0 l3x0 cmd1"])
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_pickled_error(self):
+        with self.assertRaises(UnknownCommand) as cm:
+            self.commander.call(["stauts"])
+        self.assertEqual(pickle.loads(pickle.dumps(cm.exception)).suggestions, ["status"])
+
+    def test_unknown_flag(self):
+        with self.assertRaises(UnknownFlag) as cm:
+            self.commander.call(["queue", "list", "--quite"])
+        self.assertEqual(cm.exception.suggestions, ["--quiet"])
+
+        with self.assertRaises(UnknownFlag) as cm:
+            self.commander.call(["queue", "list", "--usr=apa"])
+        self.assertEqual(cm.exception.suggestions, ["--user"])
+
+    @patch('builtins.print')
+    def test_call_with_help(self, mock_print):
+        self.commander.call_with_help(["queue", "list", "--quite"])
+        self.assertEqual(mock_print.mock_calls[:2], [
+            call("Unknown flag passed..."),
+            call("Did you mean: --quiet?"),
+        ])